@@ -1,4 +1,47 @@
+import os
 import sys
+from typing import Iterator, List, NamedTuple, Optional
+
+import numpy as np
+
+# Bytes of the mapped instruction file converted to steps at a time
+CHUNK_SIZE = 16 * 1024 * 1024
+
+# Whitespace after the last instruction (i.e. a trailing newline) is skipped by the mapped scan,
+# anything else invalid raises
+IGNORED = b" \t\r\n"
+IGNORED_LOOKUP = np.zeros(256, dtype=bool)
+IGNORED_LOOKUP[list(IGNORED)] = True
+
+
+class FloorScan(NamedTuple):
+    floor: int
+    position: Optional[int]
+
+
+class FloorIndex(NamedTuple):
+    """The position of the first instruction to reach every floor the instructions visit.
+
+    Each step moves one floor so the floors reached are contiguous, the first visit to floor k > 0 is when
+    the running maximum first reaches it (ups[k - 1]) and to floor k < 0 the running minimum (downs[-k - 1]).
+    """
+
+    floor: int
+    ups: np.ndarray
+    downs: np.ndarray
+    # First return to the starting floor, -1 if it never happens
+    zero: int
+
+    def position(self, destination: int) -> int:
+        """Return the index of the first instruction that takes you to destination, raises ValueError if not possible"""
+        if destination > 0 and destination <= len(self.ups):
+            return int(self.ups[destination - 1])
+        elif destination < 0 and -destination <= len(self.downs):
+            return int(self.downs[-destination - 1])
+        elif destination == 0 and self.zero != -1:
+            return self.zero
+
+        raise ValueError(f"Can't reach position {destination} with these instructions.")
 
 
 # Part 1
@@ -35,9 +78,184 @@ def determine_position(
     raise ValueError(f"Can't reach position {destination} with these instructions.")
 
 
+def step_lookup(up: str = "(", down: str = ")") -> np.ndarray:
+    """Return a table mapping each byte to its floor change, +1 for up, -1 for down and 0 otherwise."""
+    lookup = np.zeros(256, dtype=np.int8)
+    lookup[ord(up)] = 1
+    lookup[ord(down)] = -1
+
+    return lookup
+
+
+def validate_chunk(chunk: np.ndarray, lookup: np.ndarray, trailing: bool) -> bool:
+    """Raise ValueError if the chunk holds anything but instructions and trailing whitespace.
+
+    trailing: Whether whitespace was already seen in an earlier chunk, returns whether it has been now.
+    """
+    is_step: np.ndarray = lookup[chunk] != 0
+    is_ignored: np.ndarray = IGNORED_LOOKUP[chunk]
+
+    invalid: np.ndarray = ~(is_step | is_ignored)
+    if invalid.any():
+        raise ValueError(f"Invalid instruction {chr(chunk[np.argmax(invalid)])}")
+
+    if not trailing and not is_ignored.any():
+        return False
+
+    # Whitespace doesn't count as a position, so it can't come before an instruction
+    first_ignored: int = 0 if trailing else int(np.argmax(is_ignored))
+    if is_step[first_ignored:].any():
+        raise ValueError("Invalid whitespace, only trailing whitespace is allowed")
+
+    return True
+
+
+def mapped_chunks(filename: str, chunk_size: int = CHUNK_SIZE) -> Iterator[np.ndarray]:
+    """Yield consecutive uint8 views of a memory mapped file, chunk_size bytes at a time."""
+    # A file can't be mapped if it's empty
+    if not os.path.getsize(filename):
+        return
+
+    mapped = np.memmap(filename, dtype=np.uint8, mode="r")
+    for offset in range(0, len(mapped), chunk_size):
+        yield mapped[offset : offset + chunk_size]
+
+
+def scan_instructions(
+    filename: str,
+    destination: int = -1,
+    up: str = "(",
+    down: str = ")",
+    chunk_size: int = CHUNK_SIZE,
+) -> FloorScan:
+    """Return the final floor and the position of the first instruction to reach destination in one pass.
+
+    The file is memory mapped and processed chunk_size bytes at a time so memory use doesn't grow with the input,
+    position is None if destination is never reached.
+    """
+    lookup: np.ndarray = step_lookup(up, down)
+
+    floor: int = 0
+    position: Optional[int] = None
+    consumed: int = 0
+    trailing: bool = False
+
+    for chunk in mapped_chunks(filename, chunk_size):
+        trailing = validate_chunk(chunk, lookup, trailing)
+        steps: np.ndarray = lookup[chunk]
+
+        # Carry the floor from the previous chunk into this chunk's running total
+        floors: np.ndarray = np.cumsum(steps, dtype=np.int64) + floor
+
+        if position is None:
+            # Trailing whitespace isn't an instruction, so it can't be the position of one
+            reached: np.ndarray = (floors == destination) & (steps != 0)
+            if reached.any():
+                position = consumed + int(np.argmax(reached)) + 1
+
+        floor = int(floors[-1])
+        consumed += len(chunk)
+
+    return FloorScan(floor, position)
+
+
+def build_floor_index(
+    filename: str, up: str = "(", down: str = ")", chunk_size: int = CHUNK_SIZE
+) -> FloorIndex:
+    """Build a FloorIndex in one pass over the memory mapped instruction file."""
+    lookup: np.ndarray = step_lookup(up, down)
+
+    floor: int = 0
+    consumed: int = 0
+    highest: int = 0
+    lowest: int = 0
+    zero: int = -1
+    ups: List[np.ndarray] = []
+    downs: List[np.ndarray] = []
+    trailing: bool = False
+
+    for chunk in mapped_chunks(filename, chunk_size):
+        # Same checks as scan_instructions, an index built from a corrupt file would be reused forever
+        trailing = validate_chunk(chunk, lookup, trailing)
+        steps: np.ndarray = lookup[chunk]
+        floors: np.ndarray = np.cumsum(steps, dtype=np.int64) + floor
+
+        # The running maximum is sorted so each new floor's first visit is a binary search away
+        running_max: np.ndarray = np.maximum.accumulate(floors)
+        if running_max[-1] > highest:
+            new_floors = np.arange(highest + 1, running_max[-1] + 1)
+            ups.append(consumed + np.searchsorted(running_max, new_floors) + 1)
+            highest = int(running_max[-1])
+
+        # Negate the running minimum so it's sorted ascending as well
+        running_min: np.ndarray = -np.minimum.accumulate(floors)
+        if running_min[-1] > -lowest:
+            new_floors = np.arange(-lowest + 1, running_min[-1] + 1)
+            downs.append(consumed + np.searchsorted(running_min, new_floors) + 1)
+            lowest = -int(running_min[-1])
+
+        if zero == -1:
+            # Only a step can return to the starting floor, the floor before any of them is 0 as well
+            returned: np.ndarray = (floors == 0) & (steps != 0)
+            if returned.any():
+                zero = consumed + int(np.argmax(returned)) + 1
+
+        floor = int(floors[-1])
+        consumed += len(chunk)
+
+    return FloorIndex(
+        floor,
+        np.concatenate(ups) if ups else np.empty(0, dtype=np.int64),
+        np.concatenate(downs) if downs else np.empty(0, dtype=np.int64),
+        zero,
+    )
+
+
+def save_floor_index(index: FloorIndex, filename: str, source: str) -> None:
+    """Save the index to filename along with the size and modification time of the source instructions."""
+    stat = os.stat(source)
+    with open(filename, "wb") as index_file:
+        np.savez(
+            index_file,
+            floor=index.floor,
+            ups=index.ups,
+            downs=index.downs,
+            zero=index.zero,
+            source=(stat.st_size, stat.st_mtime_ns),
+        )
+
+
+def load_floor_index(filename: str, source: str) -> Optional[FloorIndex]:
+    """Return the index saved in filename, None if it doesn't exist or source has changed since it was saved."""
+    if not os.path.exists(filename):
+        return None
+
+    stat = os.stat(source)
+    with np.load(filename) as saved:
+        if tuple(saved["source"]) != (stat.st_size, stat.st_mtime_ns):
+            return None
+
+        return FloorIndex(
+            int(saved["floor"]), saved["ups"], saved["downs"], int(saved["zero"])
+        )
+
+
+def floor_index(filename: str, index_filename: Optional[str] = None) -> FloorIndex:
+    """Return the FloorIndex for filename, loaded from index_filename if it's current or built and saved there."""
+    if index_filename is not None:
+        index: Optional[FloorIndex] = load_floor_index(index_filename, filename)
+        if index is not None:
+            return index
+
+    index = build_floor_index(filename)
+    if index_filename is not None:
+        save_floor_index(index, index_filename, filename)
+
+    return index
+
+
 def main():
     filename: str = sys.argv[1]
-    instructions: str = open(filename).read()
 
     assert calc_floor("(())") == 0
     assert calc_floor("()()") == 0
@@ -49,15 +267,16 @@ def main():
     assert calc_floor(")))") == -3
     assert calc_floor(")())())") == -3
 
-    destination: int = calc_floor(instructions)
-    print(f"floor: {destination}")
-
     assert determine_position(")") == 1
     assert determine_position("()())") == 5
 
-    position: int = determine_position(instructions)
-    print(f"position: {position}")
+    scan: FloorScan = scan_instructions(filename)
+    print(f"floor: {scan.floor}")
+
+    if scan.position is None:
+        raise ValueError("Can't reach position -1 with these instructions.")
+    print(f"position: {scan.position}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
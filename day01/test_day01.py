@@ -0,0 +1,125 @@
+import os
+import random
+
+import numpy as np
+import pytest
+
+from day1 import (
+    FloorIndex,
+    build_floor_index,
+    calc_floor,
+    determine_position,
+    floor_index,
+    load_floor_index,
+    save_floor_index,
+    scan_instructions,
+)
+
+
+def expected_position(instructions: str, destination: int):
+    try:
+        return determine_position(instructions, destination)
+    except ValueError:
+        return None
+
+
+def index_position(index: FloorIndex, destination: int):
+    try:
+        return index.position(destination)
+    except ValueError:
+        return None
+
+
+@pytest.fixture
+def instructions_file(tmp_path):
+    def write(contents: str) -> str:
+        filename = tmp_path / "input.txt"
+        filename.write_text(contents)
+        return str(filename)
+
+    return write
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("chunk_size", [1, 3, 64, 1 << 20])
+def test_scan_and_index_match_determine_position(instructions_file, seed, chunk_size):
+    rng = random.Random(seed)
+    instructions = "".join(rng.choice("()") for _ in range(rng.randint(1, 300)))
+    filename = instructions_file(instructions + "\n")
+
+    index = build_floor_index(filename, chunk_size=chunk_size)
+    assert index.floor == calc_floor(instructions)
+
+    for destination in range(-20, 21):
+        expected = expected_position(instructions, destination)
+
+        assert scan_instructions(filename, destination, chunk_size=chunk_size) == (
+            calc_floor(instructions),
+            expected,
+        )
+        assert index_position(index, destination) == expected
+
+
+@pytest.mark.parametrize("contents", ["", "\n", " \r\n", "()\n\n"])
+def test_whitespace_is_not_a_position(instructions_file, contents):
+    filename = instructions_file(contents)
+    instructions = contents.strip()
+
+    assert scan_instructions(filename, 0).position == expected_position(instructions, 0)
+    assert index_position(build_floor_index(filename), 0) == expected_position(
+        instructions, 0
+    )
+
+
+@pytest.mark.parametrize("contents", ["(x)", " )", "(\n)", "\t(("])
+def test_invalid_instructions(instructions_file, contents):
+    filename = instructions_file(contents)
+
+    with pytest.raises(ValueError):
+        scan_instructions(filename)
+    with pytest.raises(ValueError):
+        build_floor_index(filename)
+
+
+def test_floor_index_is_saved_and_reused(instructions_file, tmp_path):
+    filename = instructions_file("(()))(\n")
+    index_filename = str(tmp_path / "index.npz")
+
+    index = floor_index(filename, index_filename)
+    assert os.path.exists(index_filename)
+
+    loaded = load_floor_index(index_filename, filename)
+    assert loaded is not None
+    assert (loaded.floor, loaded.zero) == (index.floor, index.zero) == (0, 4)
+    np.testing.assert_array_equal(loaded.ups, index.ups)
+    np.testing.assert_array_equal(loaded.downs, index.downs)
+
+    # A saved index is returned as is, even one that doesn't match the instructions
+    save_floor_index(FloorIndex(7, index.ups, index.downs, 1), index_filename, filename)
+    assert floor_index(filename, index_filename).floor == 7
+
+
+def test_floor_index_is_rebuilt_when_stale(instructions_file, tmp_path):
+    filename = instructions_file("(()))(\n")
+    index_filename = str(tmp_path / "index.npz")
+    floor_index(filename, index_filename)
+
+    # Same size but a newer modification time
+    instructions_file(")))(((\n")
+    stat = os.stat(filename)
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert load_floor_index(index_filename, filename) is None
+
+    index = floor_index(filename, index_filename)
+    assert (index.floor, index.position(-3)) == (0, 3)
+    assert load_floor_index(index_filename, filename).position(-3) == 3
+
+    # A different size is stale too
+    instructions_file(")\n")
+    assert load_floor_index(index_filename, filename) is None
+
+
+def test_load_floor_index_without_file(instructions_file, tmp_path):
+    filename = instructions_file("()\n")
+
+    assert load_floor_index(str(tmp_path / "missing.npz"), filename) is None
@@ -0,0 +1,62 @@
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Callable, Tuple
+
+from day02 import (
+    calc_required_paper,
+    calc_required_ribbon,
+    parse_packages,
+    stream_package_totals,
+)
+
+
+def generate_packages(filename: str, count: int, max_side: int = 30) -> None:
+    """Write count random packages to filename, one LxWxH per line."""
+    with open(filename, "w") as packages_file:
+        for _ in range(count):
+            length, width, height = (random.randint(1, max_side) for _ in range(3))
+            packages_file.write(f"{length}x{width}x{height}\n")
+
+
+def current_totals(filename: str) -> Tuple[int, int]:
+    """The original main() path, readlines, a tuple of Packages and a pass for each total."""
+    packages = tuple(parse_packages(open(filename).readlines()))
+
+    total_area = sum(calc_required_paper(package) for package in packages)
+    total_ribbon = sum(calc_required_ribbon(package) for package in packages)
+
+    return total_area, total_ribbon
+
+
+def time_totals(
+    totals_func: Callable[[str], Tuple[int, int]], filename: str
+) -> Tuple[Tuple[int, int], float]:
+    """Return the totals and the seconds totals_func took to compute them."""
+    started = time.perf_counter()
+    totals = totals_func(filename)
+
+    return totals, time.perf_counter() - started
+
+
+def main():
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "packages.txt")
+        generate_packages(filename, count)
+
+        current, current_seconds = time_totals(current_totals, filename)
+        print(f"current:   {current_seconds:.2f}s for {count:,} packages")
+
+        streamed, streamed_seconds = time_totals(stream_package_totals, filename)
+        print(f"streaming: {streamed_seconds:.2f}s for {count:,} packages")
+
+    assert tuple(streamed) == current
+    print(f"Speedup: {current_seconds / streamed_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
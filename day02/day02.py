@@ -3,6 +3,11 @@ from typing import NamedTuple, List, Tuple, Iterator
 from itertools import combinations
 from functools import reduce
 
+import numpy as np
+
+# Bytes read from a package file at a time when streaming
+BUFFER_SIZE = 1024 * 1024
+
 
 class Package(NamedTuple):
     length: int
@@ -10,6 +15,11 @@ class Package(NamedTuple):
     height: int
 
 
+class PackageTotals(NamedTuple):
+    paper: int
+    ribbon: int
+
+
 def package_surfaces(package: Package) -> Iterator[Tuple[int, int]]:
     """Yield a pair of dimensions for each pair of dimensions, l,w l,h, w,h"""
     for dimension_pair in combinations(package, 2):
@@ -57,22 +67,89 @@ def calc_required_paper(package: Package) -> int:
     return sum(surface_areas) + min(side_areas)
 
 
+def parse_packages_array(raw_packages: str, seperator="x") -> np.ndarray:
+    """Return an (N, 3) array of package dimensions for a whole file of them, i.e. '2x3x4\n1x1x10'."""
+    # Like parse_package, halt on anything besides 3 dimensional packages, every non blank line needs
+    # exactly two separators
+    chars: np.ndarray = np.frombuffer(raw_packages.encode(), dtype=np.uint8)
+    line_ids: np.ndarray = np.cumsum(chars == ord("\n"))
+    lines: int = int(line_ids[-1]) + 1 if len(chars) else 0
+    separators: np.ndarray = np.bincount(
+        line_ids[chars == ord(seperator)], minlength=lines
+    )
+    blank: np.ndarray = (
+        np.bincount(line_ids[~np.isin(chars, list(b" \t\r\n"))], minlength=lines) == 0
+    )
+    packages: int = int((~blank).sum())
+
+    if (separators[~blank] != 2).any():
+        raise ValueError("Every package needs exactly 3 dimensions")
+    if not packages:
+        return np.empty((0, 3), dtype=np.int64)
+
+    # Parsing stops early on anything that isn't a number
+    dimensions: np.ndarray = np.fromstring(
+        raw_packages.replace(seperator, " "), dtype=np.int64, sep=" "
+    )
+    if len(dimensions) != 3 * packages:
+        raise ValueError("Every package needs exactly 3 dimensions")
+
+    return dimensions.reshape(-1, 3)
+
+
+def calc_required_paper_array(packages: np.ndarray) -> int:
+    """Return the total wrapping paper for an (N, 3) array of packages, see calc_required_paper."""
+    # Sort each package so the smallest side is always the first two dimensions
+    shortest, middle, longest = np.sort(packages, axis=1).T
+
+    surface_areas = 2 * (shortest * middle + middle * longest + longest * shortest)
+
+    return int((surface_areas + shortest * middle).sum())
+
+
+def calc_required_ribbon_array(packages: np.ndarray) -> int:
+    """Return the total ribbon for an (N, 3) array of packages, see calc_required_ribbon."""
+    shortest, middle, _ = np.sort(packages, axis=1).T
+
+    return int((packages.prod(axis=1) + 2 * (shortest + middle)).sum())
+
+
+def stream_package_totals(
+    filename: str, buffer_size: int = BUFFER_SIZE, seperator="x"
+) -> PackageTotals:
+    """Return the total paper and ribbon for a package file in one pass, reading buffer_size bytes at a time."""
+    paper: int = 0
+    ribbon: int = 0
+    remainder: str = ""
+
+    with open(filename) as packages_file:
+        while buffer := packages_file.read(buffer_size):
+            # Hold back the trailing partial line until the next buffer completes it
+            complete, _, remainder = (remainder + buffer).rpartition("\n")
+
+            packages: np.ndarray = parse_packages_array(complete, seperator)
+            paper += calc_required_paper_array(packages)
+            ribbon += calc_required_ribbon_array(packages)
+
+    packages = parse_packages_array(remainder, seperator)
+    paper += calc_required_paper_array(packages)
+    ribbon += calc_required_ribbon_array(packages)
+
+    return PackageTotals(paper, ribbon)
+
+
 def main():
     filename: str = sys.argv[1]
-    raw_packages: List[str] = open(filename).readlines()
-    packages = tuple(parse_packages(raw_packages))
 
     assert calc_required_paper(Package(2, 3, 4)) == 58
     assert calc_required_paper(Package(1, 1, 10)) == 43
     assert calc_required_ribbon(Package(2, 3, 4)) == 34
     assert calc_required_ribbon(Package(1, 1, 10)) == 14
 
-    total_area = sum(calc_required_paper(package) for package in packages)
-    print(f"Total paper: {total_area}")
-
-    total_ribbon = sum(calc_required_ribbon(package) for package in packages)
-    print(f"Total ribbon: {total_ribbon}")
+    totals: PackageTotals = stream_package_totals(filename)
+    print(f"Total paper: {totals.paper}")
+    print(f"Total ribbon: {totals.ribbon}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
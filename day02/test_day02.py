@@ -0,0 +1,69 @@
+import pytest
+
+from day02 import (
+    Package,
+    calc_required_paper,
+    calc_required_paper_array,
+    calc_required_ribbon,
+    calc_required_ribbon_array,
+    parse_package,
+    parse_packages,
+    parse_packages_array,
+    stream_package_totals,
+)
+
+
+@pytest.mark.parametrize(
+    "package, paper, ribbon",
+    [(Package(2, 3, 4), 58, 34), (Package(1, 1, 10), 43, 14)],
+)
+def test_calc_required(package, paper, ribbon):
+    assert calc_required_paper(package) == paper
+    assert calc_required_ribbon(package) == ribbon
+
+
+@pytest.mark.parametrize(
+    "raw_packages, expected",
+    [
+        ("2x3x4\n1x1x10", [(2, 3, 4), (1, 1, 10)]),
+        ("2x3x4\n1x1x10\n", [(2, 3, 4), (1, 1, 10)]),
+        ("2x3x4\r\n\n1x1x10\r\n", [(2, 3, 4), (1, 1, 10)]),
+        ("", []),
+        ("\n", []),
+    ],
+)
+def test_parse_packages_array(raw_packages, expected):
+    packages = parse_packages_array(raw_packages)
+
+    assert packages.shape == (len(expected), 3)
+    assert [tuple(package) for package in packages.tolist()] == [
+        parse_package(line) for line in raw_packages.split() if line
+    ]
+
+
+@pytest.mark.parametrize(
+    "raw_packages", ["1x1\n1x1x1x1", "2x3x4x5", "2x3\n", "2 3 4", "2xx3", "2x3xa"]
+)
+def test_parse_packages_array_exceptions(raw_packages):
+    with pytest.raises(ValueError):
+        parse_packages_array(raw_packages)
+
+
+def test_calc_required_array():
+    packages = parse_packages_array("2x3x4\n1x1x10")
+
+    assert calc_required_paper_array(packages) == 101
+    assert calc_required_ribbon_array(packages) == 48
+
+
+@pytest.mark.parametrize("buffer_size", [1, 5, 64, 1024 * 1024])
+def test_stream_package_totals(tmp_path, buffer_size):
+    raw_packages = [f"{idx % 7 + 1}x{idx % 5 + 2}x{idx % 11 + 1}" for idx in range(500)]
+    filename = tmp_path / "input.txt"
+    filename.write_text("\n".join(raw_packages) + "\n")
+    packages = tuple(parse_packages(raw_packages))
+
+    assert stream_package_totals(str(filename), buffer_size) == (
+        sum(map(calc_required_paper, packages)),
+        sum(map(calc_required_ribbon, packages)),
+    )
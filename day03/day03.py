@@ -1,6 +1,70 @@
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from typing import List, Tuple, Iterable, Set, Optional
 
+import numpy as np
+
+# Smallest and largest coordinate pack_houses can fit in 32 bits
+COORDINATE_RANGE = (-(2**31), 2**31 - 1)
+
+
+class VisitedHouses:
+    """Visited houses packed into int64s, compacted with np.unique whenever the count is needed."""
+
+    def __init__(self) -> None:
+        self.houses: List[np.ndarray] = []
+        self.compacted: bool = True
+
+    def add(self, houses: np.ndarray) -> None:
+        """Add an array of packed houses, duplicates are allowed."""
+        self.houses.append(houses)
+        self.compacted = False
+
+    def __len__(self) -> int:
+        if not self.compacted:
+            self.houses = [np.unique(np.concatenate(self.houses))]
+            self.compacted = True
+
+        return sum(len(houses) for houses in self.houses)
+
+
+def zigzag(values: np.ndarray) -> np.ndarray:
+    """Map signed integers onto unsigned ones, 0, -1, 1, -2 ... to 0, 1, 2, 3 ..."""
+    return ((values << 1) ^ (values >> 63)).astype(np.uint64)
+
+
+def pack_houses(xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    """Pack each x, y pair into a single int64, the zigzagged x in the high 32 bits and y in the low 32 bits.
+
+    Coordinates must be within COORDINATE_RANGE so they fit in 32 bits once zigzagged, raises ValueError otherwise.
+    """
+    low, high = COORDINATE_RANGE
+    for values in (xs, ys):
+        if len(values) and (values.min() < low or values.max() > high):
+            raise ValueError(
+                f"Houses can only be packed for coordinates from {low} to {high}"
+            )
+
+    return ((zigzag(xs) << np.uint64(32)) | zigzag(ys)).view(np.int64)
+
+
+def direction_deltas(
+    east=">", west="<", north="^", south="v"
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return lookup tables from a direction's byte to its x and y deltas, and whether it's valid."""
+    x_deltas = np.zeros(256, dtype=np.int64)
+    y_deltas = np.zeros(256, dtype=np.int64)
+    valid = np.zeros(256, dtype=bool)
+
+    x_deltas[ord(east)] = 1
+    x_deltas[ord(west)] = -1
+    y_deltas[ord(north)] = 1
+    y_deltas[ord(south)] = -1
+    valid[[ord(east), ord(west), ord(north), ord(south)]] = True
+
+    return x_deltas, y_deltas, valid
+
 
 def find_visited_houses(
     directions: Iterable[str],
@@ -41,17 +105,99 @@ def find_visited_houses(
     return len(visited)
 
 
-def visit_with_robot_santa(directions: List[str]) -> int:
-    """Have santa/robot santa visit each house and return the combined number of visited houses."""
-    santa_directions: List[str] = directions[0::2]
-    robot_directions: List[str] = directions[1::2]
-    visited: Set[Tuple[int, int]] = set()
+def parse_steps(
+    directions: Iterable[str], east=">", west="<", north="^", south="v"
+) -> np.ndarray:
+    """Return the directions as a uint8 array of their bytes, raises ValueError on an invalid direction."""
+    if isinstance(directions, str):
+        steps = np.frombuffer(directions.encode("ascii"), dtype=np.uint8)
+    else:
+        steps = np.frombuffer("".join(directions).encode("ascii"), dtype=np.uint8)
+
+    _, _, valid = direction_deltas(east, west, north, south)
+    if not valid[steps].all():
+        invalid: int = steps[np.argmin(valid[steps])]
+        raise ValueError(f"Invalid direction: {chr(invalid)}")
+
+    return steps
+
+
+def walk_houses(
+    steps: np.ndarray,
+    x_deltas: np.ndarray,
+    y_deltas: np.ndarray,
+    x: int = 0,
+    y: int = 0,
+) -> np.ndarray:
+    """Return every house visited walking steps from x, y as packed int64s, including the starting house."""
+    xs = np.cumsum(np.concatenate(([x], x_deltas[steps])))
+    ys = np.cumsum(np.concatenate(([y], y_deltas[steps])))
 
-    # We don't care about the number of houses after only Santa has visited
-    _ = find_visited_houses(santa_directions, visited=visited)
-    number_houses_visited: int = find_visited_houses(robot_directions, visited=visited)
+    return pack_houses(xs, ys)
 
-    return number_houses_visited
+
+def find_visited_houses_packed(
+    directions: Iterable[str],
+    x: int = 0,
+    y: int = 0,
+    east=">",
+    west="<",
+    north="^",
+    south="v",
+    visited: Optional[VisitedHouses] = None,
+) -> int:
+    """Return the number of houses visited at least once, walking every step at once with a cumulative sum."""
+    # Allow passing initialized visited to handle santa/robot santa
+    if visited is None:
+        visited = VisitedHouses()
+
+    steps: np.ndarray = parse_steps(directions, east, west, north, south)
+    x_deltas, y_deltas, _ = direction_deltas(east, west, north, south)
+    visited.add(walk_houses(steps, x_deltas, y_deltas, x, y))
+
+    return len(visited)
+
+
+def visit_with_agents(
+    directions: Iterable[str],
+    agents: int = 2,
+    workers: int = 1,
+    east=">",
+    west="<",
+    north="^",
+    south="v",
+) -> int:
+    """Deal the directions out to agents round-robin and return the combined number of visited houses.
+
+    workers: Walk the agents in a pool of this many processes when greater than 1.
+    """
+    steps: np.ndarray = parse_steps(directions, east, west, north, south)
+    x_deltas, y_deltas, _ = direction_deltas(east, west, north, south)
+
+    # Strided views, every agent's directions share the one steps array
+    agent_steps: List[np.ndarray] = [steps[agent::agents] for agent in range(agents)]
+    visited = VisitedHouses()
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            walks = executor.map(
+                walk_houses,
+                agent_steps,
+                repeat(x_deltas, agents),
+                repeat(y_deltas, agents),
+            )
+            for houses in walks:
+                visited.add(houses)
+    else:
+        for steps in agent_steps:
+            visited.add(walk_houses(steps, x_deltas, y_deltas))
+
+    return len(visited)
+
+
+def visit_with_robot_santa(directions: List[str]) -> int:
+    """Have santa/robot santa visit each house and return the combined number of visited houses."""
+    return visit_with_agents(directions, agents=2)
 
 
 def main():
@@ -62,7 +208,7 @@ def main():
     assert find_visited_houses(list("^>v<")) == 4
     assert find_visited_houses(list("^v^v^v^v^v")) == 2
 
-    visited_houses = find_visited_houses(directions)
+    visited_houses = find_visited_houses_packed(directions)
     print(f"Part 1 visited houses: {visited_houses}")
 
     assert visit_with_robot_santa(list("^v")) == 3
@@ -74,4 +220,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,142 @@
+import random
+
+import numpy as np
+import pytest
+
+from day03 import (
+    COORDINATE_RANGE,
+    VisitedHouses,
+    direction_deltas,
+    find_visited_houses,
+    find_visited_houses_packed,
+    pack_houses,
+    parse_steps,
+    visit_with_agents,
+    visit_with_robot_santa,
+    walk_houses,
+)
+
+
+def random_directions(seed: int, length: int, alphabet: str = "^>v<") -> str:
+    rng = random.Random(seed)
+    return "".join(rng.choice(alphabet) for _ in range(length))
+
+
+@pytest.mark.parametrize(
+    "directions, expected", [(">", 2), ("^>v<", 4), ("^v^v^v^v^v", 2), ("", 1)]
+)
+def test_find_visited_houses(directions, expected):
+    assert find_visited_houses(list(directions)) == expected
+    assert find_visited_houses_packed(list(directions)) == expected
+    assert find_visited_houses_packed(directions) == expected
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize(
+    "x, y, alphabet",
+    [
+        (0, 0, "^>v<"),
+        (-7, 3, "^>v<"),
+        # Only head back into the range from its corner
+        (COORDINATE_RANGE[0], COORDINATE_RANGE[1], ">v"),
+    ],
+)
+def test_find_visited_houses_packed_matches_set(seed, x, y, alphabet):
+    directions = random_directions(seed, 2000, alphabet)
+
+    assert find_visited_houses_packed(directions, x, y) == find_visited_houses(
+        directions, x, y
+    )
+
+
+def split_walkers(directions: str, agents: int) -> int:
+    # Deal the directions out like the original santa/robot santa split, with a set shared by every walker
+    visited = set()
+    for agent in range(agents):
+        find_visited_houses(directions[agent::agents], visited=visited)
+
+    return len(visited)
+
+
+@pytest.mark.parametrize(
+    "directions, expected", [("^v", 3), ("^>v<", 3), ("^v^v^v^v^v", 11)]
+)
+def test_visit_with_robot_santa(directions, expected):
+    assert visit_with_robot_santa(list(directions)) == expected
+    assert split_walkers(directions, 2) == expected
+
+
+@pytest.mark.parametrize(
+    "directions, agents, expected", [("^>v<", 4, 5), ("^>v<^>v<", 4, 9), ("", 3, 1)]
+)
+def test_visit_with_agents(directions, agents, expected):
+    assert visit_with_agents(list(directions), agents=agents) == expected
+    assert visit_with_agents(directions, agents=agents, workers=2) == expected
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("agents", [1, 2, 3, 7, 50])
+def test_visit_with_agents_matches_split_walkers(seed, agents):
+    directions = random_directions(seed, 3000)
+    expected = split_walkers(directions, agents)
+
+    assert visit_with_agents(directions, agents=agents) == expected
+    if agents == 2:
+        assert visit_with_robot_santa(list(directions)) == expected
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+@pytest.mark.parametrize("agents", [2, 5])
+def test_visit_with_agents_in_pool(workers, agents):
+    directions = random_directions(agents, 3000)
+
+    assert visit_with_agents(
+        directions, agents=agents, workers=workers
+    ) == split_walkers(directions, agents)
+
+
+def test_find_visited_houses_packed_shares_visited():
+    visited = VisitedHouses()
+    find_visited_houses_packed("^>", visited=visited)
+
+    assert find_visited_houses_packed("v<<", visited=visited) == 6
+    assert len(visited) == 6
+
+
+@pytest.mark.parametrize("directions", ["^>x", "^ v", "\n"])
+def test_find_visited_houses_packed_rejects_invalid_directions(directions):
+    with pytest.raises(ValueError):
+        find_visited_houses_packed(directions)
+
+
+@pytest.mark.parametrize(
+    "xs, ys",
+    [
+        ([2**31], [0]),
+        ([0], [-(2**31) - 1]),
+        ([0, 2**40], [1, 2]),
+        ([-(2**62)], [0]),
+    ],
+)
+def test_pack_houses_rejects_coordinates_out_of_range(xs, ys):
+    with pytest.raises(ValueError):
+        pack_houses(np.array(xs, dtype=np.int64), np.array(ys, dtype=np.int64))
+
+
+def test_pack_houses_keeps_coordinates_apart():
+    low, high = COORDINATE_RANGE
+    values = np.array([low, low + 1, -1, 0, 1, high - 1, high], dtype=np.int64)
+    xs, ys = np.repeat(values, len(values)), np.tile(values, len(values))
+
+    assert len(np.unique(pack_houses(xs, ys))) == len(values) ** 2
+    assert len(pack_houses(np.empty(0, np.int64), np.empty(0, np.int64))) == 0
+
+
+def test_walk_houses_rejects_walking_out_of_range():
+    x_deltas, y_deltas, _ = direction_deltas()
+    steps = parse_steps(">>")
+
+    with pytest.raises(ValueError):
+        walk_houses(steps, x_deltas, y_deltas, x=COORDINATE_RANGE[1] - 1)
+    with pytest.raises(ValueError):
+        find_visited_houses_packed("<", x=COORDINATE_RANGE[0])
@@ -1,37 +1,281 @@
+import argparse
 import hashlib
 import math
+import os
 import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from itertools import count
+from typing import Callable, Deque, NamedTuple, Optional
 
+# Candidates each worker checks per submitted block in parallel mode
+BLOCK_SIZE = 50_000
 
-def find_hash(goal: str, secret: str, max_steps=math.inf) -> int:
-    """Find the lowest positive integer that produces a hash starting with goal, -1 if not found."""
-    for step in count(1):
-        if step > max_steps:
-            break
+# Candidates hashed between progress checks by the batched driver
+BATCH_SIZE = 100_000
 
-        hashed = hashlib.md5(f"{secret}{step}".encode("utf-8"))
+# Every candidate shares its leading digits with its 999 neighbours, so the hash state of
+# secret + leading digits is computed once and only the last three digits are hashed per candidate
+SUFFIX_BASE = 1000
+SUFFIXES = tuple(b"%d" % suffix for suffix in range(SUFFIX_BASE))
+PADDED_SUFFIXES = tuple(b"%03d" % suffix for suffix in range(SUFFIX_BASE))
 
-        if hashed.hexdigest()[0 : len(goal)] == goal:
-            return step
+
+class GoalMask(NamedTuple):
+    width: int
+    mask: int
+    target: int
+
+
+class SearchResult(NamedTuple):
+    step: int
+    hashes: int
+    seconds: float
+
+    @property
+    def hashes_per_second(self) -> float:
+        return self.hashes / self.seconds if self.seconds else 0.0
+
+
+def compile_goal(goal: str) -> GoalMask:
+    """Return the mask and target to compare the leading digest bytes against for a hex prefix goal.
+
+    Raises ValueError if goal isn't hexadecimal.
+    """
+    # Odd length goals only care about the high nibble of their last byte
+    width: int = (len(goal) + 1) // 2
+    padding: str = "0" * (width * 2 - len(goal))
+
+    return GoalMask(
+        width,
+        int.from_bytes(bytes.fromhex("f" * len(goal) + padding), "big"),
+        int.from_bytes(bytes.fromhex(goal + padding), "big"),
+    )
+
+
+def steps_stop(max_steps):
+    """Return the exclusive stop of a search that checks every integer up to max_steps, which needn't be integral."""
+    return math.floor(max_steps) + 1 if math.isfinite(max_steps) else max_steps
+
+
+def search_block(goal: str, secret: str, start: int, stop=math.inf) -> SearchResult:
+    """Search [start, stop) for the lowest integer that produces a hash starting with goal, step is -1 if not found."""
+    width, mask, target = compile_goal(goal)
+    if math.isfinite(stop):
+        stop = math.ceil(stop)
+    secret_state = hashlib.md5(secret.encode("utf-8"))
+    started: float = time.perf_counter()
+
+    step: int = start
+    while step < stop:
+        prefix, first_suffix = divmod(step, SUFFIX_BASE)
+        block_stop = min((prefix + 1) * SUFFIX_BASE, stop)
+
+        if prefix:
+            prefix_state = secret_state.copy()
+            prefix_state.update(b"%d" % prefix)
+            suffixes = PADDED_SUFFIXES
+        else:
+            prefix_state = secret_state
+            suffixes = SUFFIXES
+
+        for suffix in range(first_suffix, block_stop - prefix * SUFFIX_BASE):
+            hashed = prefix_state.copy()
+            hashed.update(suffixes[suffix])
+
+            if int.from_bytes(hashed.digest()[:width], "big") & mask == target:
+                return SearchResult(
+                    prefix * SUFFIX_BASE + suffix,
+                    prefix * SUFFIX_BASE + suffix - start + 1,
+                    time.perf_counter() - started,
+                )
+
+        step = block_stop
+
+    return SearchResult(-1, step - start, time.perf_counter() - started)
+
+
+def find_hash_parallel(
+    goal: str, secret: str, max_steps=math.inf, workers=2, block_size=BLOCK_SIZE
+) -> int:
+    """Find the lowest positive integer that produces a hash starting with goal across a pool of workers, -1 if not found.
+
+    The search space is striped into consecutive blocks of block_size handed out to the workers in order.
+    Results are consumed in block order so the first hit is the lowest, outstanding blocks are then cancelled.
+    """
+    steps: int = steps_stop(max_steps)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: Deque[Future] = deque()
+        starts = count(1, block_size)
+
+        def submit_block() -> None:
+            start: int = next(starts)
+            if start >= steps:
+                return
+
+            # Clip the final block to max_steps
+            stop: int = min(start + block_size, steps)
+
+            pending.append(executor.submit(search_block, goal, secret, start, stop))
+
+        # Keep every worker busy with a second block queued behind it
+        for _ in range(workers * 2):
+            submit_block()
+
+        while pending:
+            step: int = pending.popleft().result().step
+
+            if step != -1:
+                for future in pending:
+                    future.cancel()
+                return step
+
+            submit_block()
 
     return -1
 
 
+def checkpoint_key(goal: str, secret: str) -> str:
+    """Return what identifies a search in its checkpoint, so one is never resumed for another goal or secret."""
+    return f"{goal} {hashlib.sha256(secret.encode('utf-8')).hexdigest()}"
+
+
+def read_checkpoint(checkpoint: str, goal: str, secret: str) -> int:
+    """Return the step a previous search for goal and secret stopped at from its checkpoint file.
+
+    Starts over from 1 when there isn't a checkpoint or it was saved by a search for another goal or secret.
+    """
+    if not os.path.exists(checkpoint):
+        return 1
+
+    with open(checkpoint) as checkpoint_file:
+        key, _, step = checkpoint_file.read().rpartition("\n")
+
+    return int(step) if key == checkpoint_key(goal, secret) else 1
+
+
+def write_checkpoint(checkpoint: str, goal: str, secret: str, step: int) -> None:
+    """Record the next step to search, written through a temporary file so a crash can't leave it half written."""
+    temporary: str = f"{checkpoint}.tmp"
+    with open(temporary, "w") as checkpoint_file:
+        checkpoint_file.write(f"{checkpoint_key(goal, secret)}\n{step}")
+
+    os.replace(temporary, checkpoint)
+
+
+def print_progress(progress: SearchResult) -> None:
+    """Report the progress of a batched search on stderr."""
+    print(
+        f"step {progress.step:,}: {progress.hashes:,} hashes in {progress.seconds:.1f}s "
+        f"({progress.hashes_per_second:,.0f} hashes/sec)",
+        file=sys.stderr,
+    )
+
+
+def find_hash_batched(
+    goal: str,
+    secret: str,
+    max_steps=math.inf,
+    batch_size: int = BATCH_SIZE,
+    progress: Optional[Callable[[SearchResult], None]] = None,
+    interval: float = 1.0,
+    checkpoint: Optional[str] = None,
+) -> SearchResult:
+    """Search batch_size candidates at a time for the lowest integer that produces a hash starting with goal.
+
+    progress: Called with the next step to search, the hashes so far and the elapsed time every interval seconds.
+    checkpoint: File the next step to search is saved to every interval seconds, and resumed from when it exists
+    and was saved by a search for the same goal and secret.
+    """
+    start: int = read_checkpoint(checkpoint, goal, secret) if checkpoint else 1
+    step: int = start
+    hashes: int = 0
+    started: float = time.perf_counter()
+    last_report: float = started
+    steps: int = steps_stop(max_steps)
+
+    while step < steps:
+        # Clip the final batch to max_steps
+        stop: int = min(step + batch_size, steps)
+
+        result: SearchResult = search_block(goal, secret, step, stop)
+        hashes += result.hashes
+
+        if result.step != -1:
+            return SearchResult(result.step, hashes, time.perf_counter() - started)
+
+        step = stop
+        now: float = time.perf_counter()
+        if now - last_report >= interval:
+            last_report = now
+
+            if progress is not None:
+                progress(SearchResult(step, hashes, now - started))
+
+            if checkpoint is not None:
+                write_checkpoint(checkpoint, goal, secret, step)
+
+    return SearchResult(-1, hashes, time.perf_counter() - started)
+
+
+def find_hash(goal: str, secret: str, max_steps=math.inf, workers=1) -> int:
+    """Find the lowest positive integer that produces a hash starting with goal, -1 if not found.
+
+    workers: Search with a pool of this many processes when greater than 1.
+    """
+    if workers > 1:
+        return find_hash_parallel(goal, secret, max_steps, workers)
+
+    return search_block(goal, secret, 1, steps_stop(max_steps)).step
+
+
 def main():
-    filename: str = sys.argv[1]
+    parser = argparse.ArgumentParser()
+    parser.add_argument("filename")
+    parser.add_argument(
+        "--progress", action="store_true", help="Report hashing progress on stderr"
+    )
+    parser.add_argument(
+        "--checkpoint", help="Save progress to, and resume from, CHECKPOINT.<goal>"
+    )
+    args = parser.parse_args()
+
+    filename: str = args.filename
     secret: str = open(filename).read()
 
     goal = "00000"
     assert find_hash(goal, "abcdef") == 609043
     assert find_hash(goal, "pqrstuv") == 1048970
 
-    step: int = find_hash(goal, secret)
-    print(f"Part 1 step: {step}")
+    # Only the batched driver can report progress and checkpoint
+    instrumented: bool = args.progress or args.checkpoint is not None
+    progress = print_progress if args.progress else None
+
+    if instrumented:
+        result = find_hash_batched(
+            goal,
+            secret,
+            progress=progress,
+            checkpoint=f"{args.checkpoint}.{goal}" if args.checkpoint else None,
+        )
+    else:
+        result = search_block(goal, secret, 1)
+    print(f"Part 1 step: {result.step} ({result.hashes_per_second:,.0f} hashes/sec)")
 
     goal = "000000"
 
-    step: int = find_hash(goal, secret)
+    if instrumented:
+        result = find_hash_batched(
+            goal,
+            secret,
+            progress=progress,
+            checkpoint=f"{args.checkpoint}.{goal}" if args.checkpoint else None,
+        )
+        step: int = result.step
+    else:
+        step = find_hash(goal, secret, workers=os.cpu_count() or 1)
     print(f"Part 2 step: {step}")
 
 
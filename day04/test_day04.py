@@ -0,0 +1,145 @@
+import hashlib
+import math
+from itertools import count
+
+import pytest
+
+from day04 import (
+    SearchResult,
+    compile_goal,
+    find_hash,
+    find_hash_batched,
+    find_hash_parallel,
+    read_checkpoint,
+    search_block,
+    write_checkpoint,
+)
+
+
+def naive_find_hash(goal: str, secret: str, max_steps=math.inf) -> int:
+    for step in count(1):
+        if step > max_steps:
+            break
+
+        if hashlib.md5(f"{secret}{step}".encode("utf-8")).hexdigest().startswith(goal):
+            return step
+
+    return -1
+
+
+@pytest.mark.parametrize("goal", ["0", "00", "000", "5f8", "abc", "0a"])
+@pytest.mark.parametrize("secret", ["abcdef", "pqrstuv"])
+def test_find_hash(goal, secret):
+    expected = naive_find_hash(goal, secret)
+
+    assert find_hash(goal, secret) == expected
+    assert search_block(goal, secret, 1).step == expected
+    assert find_hash_parallel(goal, secret, workers=2, block_size=700) == expected
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+@pytest.mark.parametrize(
+    "max_steps", [0, 1, 999, 1000, 1001, 3336, 3337, 3336.9, 3337.5, -2, math.inf]
+)
+def test_find_hash_max_steps(workers, max_steps):
+    # 3337 is the first step whose hash starts with "000" for abcdef
+    expected = naive_find_hash("000", "abcdef", max_steps)
+
+    assert find_hash("000", "abcdef", max_steps, workers=workers) == expected
+
+
+def test_find_hash_parallel():
+    assert find_hash("00000", "abcdef", workers=4) == 609043
+    assert find_hash("00000", "abcdef", max_steps=609042, workers=4) == -1
+
+
+def test_search_block_range():
+    # 3337 and 5568 are the first two steps whose hashes start with "000" for abcdef
+    assert search_block("000", "abcdef", 3337, 3338).step == 3337
+    assert search_block("000", "abcdef", 3338).step == 5568
+    assert search_block("000", "abcdef", 3338, 5568) == (
+        -1,
+        2230,
+        pytest.approx(0, abs=1),
+    )
+
+
+def test_compile_goal_rejects_non_hex():
+    with pytest.raises(ValueError):
+        compile_goal("0g")
+
+
+@pytest.mark.parametrize("batch_size", [1, 999, 1000, 5000])
+@pytest.mark.parametrize("max_steps", [3336, 3337, 3337.5, math.inf])
+def test_find_hash_batched(batch_size, max_steps):
+    result = find_hash_batched("000", "abcdef", max_steps, batch_size=batch_size)
+
+    assert result.step == naive_find_hash("000", "abcdef", max_steps)
+    assert result.hashes == (3337 if result.step != -1 else 3336)
+
+
+def test_find_hash_batched_long_search():
+    result = find_hash_batched("00000", "abcdef", batch_size=1000, max_steps=609043)
+
+    assert result.step == 609043 and result.hashes == 609043
+
+
+def test_find_hash_batched_progress():
+    reports = []
+    result = find_hash_batched(
+        "000", "abcdef", batch_size=1000, progress=reports.append, interval=0
+    )
+
+    # Every batch without a hit is reported, with the step the next one starts at
+    assert result.step == 3337
+    assert [report.step for report in reports] == [1001, 2001, 3001]
+    assert [report.hashes for report in reports] == [1000, 2000, 3000]
+    assert all(isinstance(report, SearchResult) for report in reports)
+
+    reports.clear()
+    find_hash_batched(
+        "000", "abcdef", batch_size=1000, progress=reports.append, interval=3600
+    )
+    assert reports == []
+
+
+def test_find_hash_batched_checkpoint(tmp_path):
+    checkpoint = str(tmp_path / "checkpoint")
+    find_hash_batched(
+        "000",
+        "abcdef",
+        max_steps=3000,
+        batch_size=1000,
+        interval=0,
+        checkpoint=checkpoint,
+    )
+
+    assert read_checkpoint(checkpoint, "000", "abcdef") == 3001
+
+    # Resuming only searches the steps after the checkpoint
+    result = find_hash_batched("000", "abcdef", batch_size=1000, checkpoint=checkpoint)
+    assert result.step == 3337 and result.hashes == 337
+
+    # A checkpoint past the answer can only find the next one
+    write_checkpoint(checkpoint, "000", "abcdef", 4000)
+    assert find_hash_batched("000", "abcdef", checkpoint=checkpoint).step == 5568
+
+
+@pytest.mark.parametrize("goal, secret", [("000", "pqrstuv"), ("0000", "abcdef")])
+def test_find_hash_batched_ignores_other_checkpoints(tmp_path, goal, secret):
+    checkpoint = str(tmp_path / "checkpoint")
+    write_checkpoint(checkpoint, "000", "abcdef", 4000)
+
+    assert read_checkpoint(checkpoint, goal, secret) == 1
+    assert find_hash_batched(
+        goal, secret, checkpoint=checkpoint
+    ).step == naive_find_hash(goal, secret)
+
+
+def test_read_checkpoint_without_file(tmp_path):
+    checkpoint = tmp_path / "checkpoint"
+    assert read_checkpoint(str(checkpoint), "000", "abcdef") == 1
+
+    # Checkpoints that only hold a step can't tell which search saved them
+    checkpoint.write_text("4000")
+    assert read_checkpoint(str(checkpoint), "000", "abcdef") == 1
@@ -0,0 +1,58 @@
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+from typing import Callable, Tuple
+
+from day05 import count_nice_words, is_word_nice, is_word_nice_part2
+
+
+def generate_words(filename: str, count: int, length: int = 16) -> None:
+    """Write count random lowercase words of the given length to filename, one per line."""
+    with open(filename, "w") as words_file:
+        for _ in range(count):
+            words_file.write("".join(random.choices(string.ascii_lowercase, k=length)))
+            words_file.write("\n")
+
+
+def regex_counts(filename: str) -> Tuple[int, int]:
+    """The original main() path, readlines and a regex pass for each part."""
+    words = open(filename).readlines()
+
+    nice = sum(1 for word in words if is_word_nice(word))
+    nice_part2 = sum(1 for word in words if is_word_nice_part2(word))
+
+    return nice, nice_part2
+
+
+def time_counts(
+    counts_func: Callable[[str], Tuple[int, int]], filename: str
+) -> Tuple[Tuple[int, int], float]:
+    """Return the nice word counts and the seconds counts_func took to compute them."""
+    started = time.perf_counter()
+    counts = counts_func(filename)
+
+    return counts, time.perf_counter() - started
+
+
+def main():
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "words.txt")
+        generate_words(filename, count)
+
+        regex, regex_seconds = time_counts(regex_counts, filename)
+        print(f"regex:       {regex_seconds:.2f}s for {count:,} words")
+
+        batched, batched_seconds = time_counts(count_nice_words, filename)
+        print(f"batched:     {batched_seconds:.2f}s for {count:,} words")
+
+    assert batched == regex
+    print(f"Speedup: {regex_seconds / batched_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,54 @@
-from typing import List
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
 import sys
 import re
+import time
+
+import numpy as np
+
+VOWELS = frozenset("aeiou")
+LETTERS = frozenset("abcdefghijklmnopqrstuvwxyz")
+FORBIDDEN_PAIRS = frozenset(("ab", "cd", "pq", "xy"))
+
+# Words classified at once by the batch classifier when streaming a word file
+BATCH_SIZE = 100_000
+
+
+class WordVerdict(NamedTuple):
+    nice: bool
+    nice_part2: bool
+
+
+class Rule(NamedTuple):
+    name: str
+    # A nice word must match the rule when True, and must not match it when False
+    must_match: bool = True
+    pattern: Optional[str] = None
+    # Custom predicates must be module level functions so rule sets can be sent to worker processes
+    predicate: Optional[Callable[[str], bool]] = None
+
+
+class RuleReport(NamedTuple):
+    words: int
+    nice: int
+    # Number of words each rule matched, regardless of whether it had to
+    hits: Dict[str, int]
+    # Time spent evaluating each rule, not measured for fused evaluation
+    rule_seconds: Dict[str, float]
+    seconds: float
 
 
 def is_word_nice(word: str) -> bool:
@@ -20,11 +68,348 @@ def is_word_nice_part2(word: str) -> bool:
     return all(re.search(pattern, word) is not None for pattern in must_match)
 
 
+def classify_word(word: str) -> WordVerdict:
+    """Return whether the word is nice for part 1 and part 2 from a single left to right pass."""
+    vowels: int = 0
+    has_double: bool = False
+    has_forbidden: bool = False
+    has_repeated_pair: bool = False
+    has_sandwich: bool = False
+
+    # Where each letter pair first ended, to tell overlapping repeats (aaa) from real ones (aaaa)
+    pair_ends: Dict[str, int] = {}
+    previous: str = ""
+    before_previous: str = ""
+
+    for idx, char in enumerate(word):
+        if char in VOWELS:
+            vowels += 1
+
+        if previous:
+            pair: str = previous + char
+
+            if pair in FORBIDDEN_PAIRS:
+                has_forbidden = True
+
+            if char in LETTERS and previous in LETTERS:
+                if char == previous:
+                    has_double = True
+
+                if not has_repeated_pair:
+                    if idx - pair_ends.setdefault(pair, idx) >= 2:
+                        has_repeated_pair = True
+
+        if char == before_previous and char in LETTERS:
+            has_sandwich = True
+
+        before_previous, previous = previous, char
+
+    return WordVerdict(
+        vowels >= 3 and has_double and not has_forbidden,
+        has_repeated_pair and has_sandwich,
+    )
+
+
+def ascii_codes(chars: str) -> np.ndarray:
+    """Return the characters as a uint8 array of their code points."""
+    return np.frombuffer(chars.encode("ascii"), dtype=np.uint8)
+
+
+def pair_codes(chars: np.ndarray) -> np.ndarray:
+    """Return a code for each adjacent pair of characters in every row of a (words, length) uint8 array."""
+    return chars[:, :-1].astype(np.uint16) << 8 | chars[:, 1:]
+
+
+def classify_words(words: List[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    """Return boolean arrays of whether each word is nice for part 1 and part 2.
+
+    Every criterion from classify_word is evaluated column by column across the whole batch at once.
+    """
+    # Shorter words are padded with zero bytes, which are never letters
+    padded: np.ndarray = np.array(words, dtype=bytes)
+    chars: np.ndarray = padded.view(np.uint8).reshape(len(words), padded.itemsize)
+
+    letters: np.ndarray = (chars >= ord("a")) & (chars <= ord("z"))
+    letter_pairs: np.ndarray = letters[:, :-1] & letters[:, 1:]
+    pairs: np.ndarray = pair_codes(chars)
+
+    vowels: np.ndarray = np.isin(chars, ascii_codes("".join(VOWELS)))
+    has_double = ((chars[:, :-1] == chars[:, 1:]) & letter_pairs).any(axis=1)
+
+    forbidden_codes = pair_codes(ascii_codes("".join(FORBIDDEN_PAIRS)).reshape(-1, 2))
+    has_forbidden = np.isin(pairs, forbidden_codes).any(axis=1)
+
+    has_sandwich = ((chars[:, :-2] == chars[:, 2:]) & letters[:, 2:]).any(axis=1)
+
+    # A pair repeated at least two positions later doesn't overlap itself
+    has_repeated_pair = np.zeros(len(words), dtype=bool)
+    for offset in range(2, pairs.shape[1]):
+        has_repeated_pair |= (
+            (pairs[:, offset:] == pairs[:, :-offset]) & letter_pairs[:, offset:]
+        ).any(axis=1)
+
+    return (
+        (vowels.sum(axis=1) >= 3) & has_double & ~has_forbidden,
+        has_repeated_pair & has_sandwich,
+    )
+
+
+def count_nice_words(filename: str, batch_size: int = BATCH_SIZE) -> Tuple[int, int]:
+    """Return the number of part 1 and part 2 nice words, streaming the word file batch_size lines at a time."""
+    nice: int = 0
+    nice_part2: int = 0
+
+    with open(filename, "rb") as words_file:
+        while batch := [line.rstrip(b"\n") for line in islice(words_file, batch_size)]:
+            batch_nice, batch_nice_part2 = classify_words(batch)
+            nice += int(batch_nice.sum())
+            nice_part2 += int(batch_nice_part2.sum())
+
+    return nice, nice_part2
+
+
+def must_match(pattern: str, name: Optional[str] = None) -> Rule:
+    """Return a rule nice words must match."""
+    return Rule(name or pattern, True, pattern=pattern)
+
+
+def cant_match(pattern: str, name: Optional[str] = None) -> Rule:
+    """Return a rule nice words must not match."""
+    return Rule(name or pattern, False, pattern=pattern)
+
+
+def custom(
+    predicate: Callable[[str], bool], name: Optional[str] = None, must_match=True
+) -> Rule:
+    """Return a rule evaluated by calling predicate with the word."""
+    return Rule(name or predicate.__name__, must_match, predicate=predicate)
+
+
+def shift_backreferences(pattern: str, offset: int) -> str:
+    """Return the pattern with each numbered backreference outside a character class shifted by offset."""
+    shifted: List[str] = []
+    in_class: bool = False
+    idx: int = 0
+
+    while idx < len(pattern):
+        char: str = pattern[idx]
+
+        if char == "\\" and idx + 1 < len(pattern):
+            # Inside a character class \1 is an octal escape, not a backreference
+            digits = re.match(r"\d+", pattern[idx + 1 :])
+            if digits and not in_class:
+                shifted.append(f"\\{int(digits.group()) + offset}")
+                idx += 1 + len(digits.group())
+                continue
+
+            shifted.append(pattern[idx : idx + 2])
+            idx += 2
+            continue
+
+        if char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+
+        shifted.append(char)
+        idx += 1
+
+    return "".join(shifted)
+
+
+class RuleSet:
+    """Rules compiled into one fused regex, each pattern rule is an always succeeding lookahead.
+
+    A lookahead that finds its pattern anywhere in the word sets that rule's named group, so a single
+    match call reports every pattern rule's hit at once.
+    """
+
+    def __init__(self, rules: Iterable[Rule]) -> None:
+        self.rules: Tuple[Rule, ...] = tuple(rules)
+        self.compiled: Dict[str, re.Pattern] = {
+            rule.name: re.compile(rule.pattern)
+            for rule in self.rules
+            if rule.pattern is not None
+        }
+
+        # Index into the fused match's groups() for each pattern rule, None for predicates
+        self.group_indices: List[Optional[int]] = []
+        lookaheads: List[str] = []
+        groups: int = 0
+        for rule in self.rules:
+            if rule.pattern is None:
+                self.group_indices.append(None)
+                continue
+
+            # Account for the group wrapping this rule and every group from the rules before it
+            pattern = shift_backreferences(rule.pattern, groups + 1)
+            lookaheads.append(f"(?=(?s:.*?)({pattern})|)")
+            self.group_indices.append(groups)
+            groups += 1 + self.compiled[rule.name].groups
+
+        self.fused: re.Pattern = re.compile("".join(lookaheads))
+
+    def hits(self, word: str) -> Iterator[Tuple[Rule, bool]]:
+        """Yield each rule and whether the word matched it."""
+        match = self.fused.match(word)
+        assert match is not None  # Every lookahead can match the empty string
+        groups = match.groups()
+
+        for rule, group_idx in zip(self.rules, self.group_indices):
+            if group_idx is None:
+                yield rule, bool(rule.predicate(word))  # type: ignore
+            else:
+                yield rule, groups[group_idx] is not None
+
+    def is_nice(self, word: str) -> bool:
+        """Return whether the word satisfies every rule."""
+        return all(hit == rule.must_match for rule, hit in self.hits(word))
+
+
+def evaluate_words(rule_set: RuleSet, words: List[str], fused=False) -> RuleReport:
+    """Evaluate a batch of words against the rule set and report nice words, per rule hits and timing.
+
+    fused: Find every pattern rule's hits with one fused regex match per word, rules aren't timed separately.
+    Python's re scans the lazy lookahead prefixes slower than it runs each compiled pattern's search, so this
+    is only worth it for rule sets dominated by many cheap patterns.
+    """
+    started: float = time.perf_counter()
+    rule_seconds: Dict[str, float] = {}
+
+    # Whether each word matched, one column of the batch per rule
+    columns: List[List[bool]] = []
+
+    if not fused:
+        for rule in rule_set.rules:
+            rule_started: float = time.perf_counter()
+
+            if rule.predicate is not None:
+                check = rule.predicate
+            else:
+                check = rule_set.compiled[rule.name].search
+
+            columns.append([bool(check(word)) for word in words])
+            rule_seconds[rule.name] = time.perf_counter() - rule_started
+    else:
+        # Every lookahead can match the empty string so match never returns None
+        matches = [rule_set.fused.match(word).groups() for word in words]  # type: ignore
+
+        for rule, group_idx in zip(rule_set.rules, rule_set.group_indices):
+            if group_idx is None:
+                columns.append([bool(rule.predicate(word)) for word in words])  # type: ignore
+            else:
+                columns.append([groups[group_idx] is not None for groups in matches])
+
+    hits: Dict[str, int] = {
+        rule.name: sum(column) for rule, column in zip(rule_set.rules, columns)
+    }
+
+    # A word is nice when every rule it had to match matched and no rule it couldn't match did
+    passes = [
+        [hit == rule.must_match for hit in column]
+        for rule, column in zip(rule_set.rules, columns)
+    ]
+    nice: int = sum(map(all, zip(*passes))) if passes else len(words)
+
+    return RuleReport(
+        len(words), nice, hits, rule_seconds, time.perf_counter() - started
+    )
+
+
+def merge_reports(reports: Iterable[RuleReport]) -> RuleReport:
+    """Combine the reports from several batches into one."""
+    words: int = 0
+    nice: int = 0
+    hits: Dict[str, int] = {}
+    rule_seconds: Dict[str, float] = {}
+    seconds: float = 0.0
+
+    for report in reports:
+        words += report.words
+        nice += report.nice
+        seconds += report.seconds
+
+        for name, count in report.hits.items():
+            hits[name] = hits.get(name, 0) + count
+        for name, rule_time in report.rule_seconds.items():
+            rule_seconds[name] = rule_seconds.get(name, 0.0) + rule_time
+
+    return RuleReport(words, nice, hits, rule_seconds, seconds)
+
+
+def read_batches(filename: str, batch_size: int = BATCH_SIZE) -> Iterator[List[str]]:
+    """Yield lists of up to batch_size words from a word file, one word per line."""
+    with open(filename) as words_file:
+        while batch := [line.rstrip("\n") for line in islice(words_file, batch_size)]:
+            yield batch
+
+
+def evaluate_file(
+    rule_set: RuleSet,
+    filename: str,
+    batch_size: int = BATCH_SIZE,
+    workers: int = 1,
+    fused=False,
+) -> RuleReport:
+    """Evaluate every word in a word file against the rule set, batch_size words at a time.
+
+    workers: Evaluate batches in a pool of this many processes when greater than 1, seconds is then the
+    summed time spent in the workers.
+    """
+    evaluate = partial(evaluate_words, rule_set, fused=fused)
+
+    if workers > 1:
+        return merge_reports(
+            evaluate_parallel(evaluate, read_batches(filename, batch_size), workers)
+        )
+
+    return merge_reports(map(evaluate, read_batches(filename, batch_size)))
+
+
+def evaluate_parallel(
+    evaluate: Callable[[List[str]], RuleReport],
+    batches: Iterator[List[str]],
+    workers: int,
+) -> Iterator[RuleReport]:
+    """Yield the report for each batch from a pool of workers, only reading batches as workers free up."""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: Deque[Future] = deque()
+
+        def submit_batch() -> None:
+            batch: Optional[List[str]] = next(batches, None)
+            if batch is not None:
+                pending.append(executor.submit(evaluate, batch))
+
+        # Keep every worker busy with a second batch queued behind it
+        for _ in range(workers * 2):
+            submit_batch()
+
+        while pending:
+            report: RuleReport = pending.popleft().result()
+            submit_batch()
+            yield report
+
+
+PART_1_RULES = RuleSet(
+    (
+        must_match(r"[aeiou]{1,}.*[aeiou]{1,}.*[aeiou]{1,}", "three vowels"),
+        must_match(r"([a-z])\1", "double letter"),
+        cant_match(r"ab|cd|pq|xy", "forbidden pair"),
+    )
+)
+
+PART_2_RULES = RuleSet(
+    (
+        must_match(r"([a-z][a-z]).*\1", "repeated pair"),
+        must_match(r"([a-z])[^\1]\1", "letter sandwich"),
+    )
+)
+
+
 def main():
     filename: str = sys.argv[1]
-    words: List[str] = open(filename).readlines()
+    nice, nice_part2 = count_nice_words(filename)
 
-    nice: int = sum(1 for word in words if is_word_nice(word))
     print(f"Part 1 nice word count: {nice}")
 
     assert is_word_nice("ugknbfddgicrmopn")
@@ -33,8 +418,7 @@ def main():
     assert not is_word_nice("haegwjzuvuyypxyu")
     assert not is_word_nice("dvszwmarrgswjxmb")
 
-    nice: int = sum(1 for word in words if is_word_nice_part2(word))
-    print(f"Part 2 nice word count: {nice}")
+    print(f"Part 2 nice word count: {nice_part2}")
 
     assert is_word_nice_part2("qjhvhtzxzqqjkmpb")
     assert is_word_nice_part2("xxyxx")
@@ -43,4 +427,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
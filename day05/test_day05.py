@@ -0,0 +1,88 @@
+from functools import partial
+import random
+
+import pytest
+
+from day05 import (
+    PART_1_RULES,
+    PART_2_RULES,
+    classify_word,
+    count_nice_words,
+    evaluate_file,
+    evaluate_parallel,
+    evaluate_words,
+    is_word_nice,
+    is_word_nice_part2,
+)
+
+
+@pytest.fixture
+def words_file(tmp_path):
+    rng = random.Random(5)
+    words = [
+        "".join(rng.choice("abcdxyaeiou") for _ in range(rng.randint(1, 16)))
+        for _ in range(2000)
+    ]
+    words += ["ugknbfddgicrmopn", "qjhvhtzxzqqjkmpb", "aaa", "aaaa", "xxyxx"]
+    filename = tmp_path / "words.txt"
+    filename.write_text("\n".join(words) + "\n")
+
+    return str(filename), words
+
+
+@pytest.mark.parametrize(
+    "word, expected",
+    [
+        ("ugknbfddgicrmopn", (True, False)),
+        ("qjhvhtzxzqqjkmpb", (False, True)),
+        ("aaa", (True, False)),
+        ("aaaa", (True, True)),
+        ("jchzalrnumimnmhp", (False, False)),
+    ],
+)
+def test_classify_word(word, expected):
+    assert classify_word(word) == expected
+    assert (is_word_nice(word), is_word_nice_part2(word)) == expected
+
+
+def test_rule_sets():
+    assert PART_1_RULES.is_nice("ugknbfddgicrmopn")
+    assert not PART_1_RULES.is_nice("haegwjzuvuyypxyu")
+    assert PART_2_RULES.is_nice("qjhvhtzxzqqjkmpb")
+    assert not PART_2_RULES.is_nice("ieodomkazucvgmuy")
+
+
+def test_count_nice_words(words_file):
+    filename, words = words_file
+
+    assert count_nice_words(filename, batch_size=300) == (
+        sum(map(is_word_nice, words)),
+        sum(map(is_word_nice_part2, words)),
+    )
+
+
+@pytest.mark.parametrize("workers, fused", [(1, False), (1, True), (2, False)])
+def test_evaluate_file_matches_count_nice_words(words_file, workers, fused):
+    filename, words = words_file
+    nice, nice_part2 = count_nice_words(filename)
+
+    report = evaluate_file(
+        PART_1_RULES, filename, batch_size=300, workers=workers, fused=fused
+    )
+    assert (report.words, report.nice) == (len(words), nice)
+    assert evaluate_file(PART_2_RULES, filename, 300, workers, fused).nice == nice_part2
+
+
+def test_evaluate_parallel_reads_batches_as_workers_free_up():
+    read: list = []
+
+    def batches():
+        for idx in range(100):
+            read.append(idx)
+            yield ["aaa"] * 10
+
+    reports = evaluate_parallel(partial(evaluate_words, PART_1_RULES), batches(), 2)
+
+    assert next(reports).nice == 10
+    assert len(read) <= 5
+    assert sum(report.nice for report in reports) == 990
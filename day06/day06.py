@@ -1,8 +1,21 @@
 import re
 import sys
+from array import array
+from bisect import bisect_left
 from collections import defaultdict
-from functools import reduce
-from typing import Callable, DefaultDict, Iterator, List, NamedTuple, Sequence, Tuple
+from typing import (
+    Callable,
+    DefaultDict,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
 
 # Part 1
 # toggle: invert state
@@ -25,6 +38,40 @@ PART_2_OPERATIONS = {
     "turn off": lambda brightness: brightness + (-1 if brightness >= 1 else 0),
 }
 
+# The same operations applied in place to a whole rectangle (a NumPy view) at once
+PART_1_ARRAY_OPERATIONS = {
+    "toggle": lambda region: np.bitwise_xor(region, 1, out=region),
+    "turn on": lambda region: region.fill(1),
+    "turn off": lambda region: region.fill(0),
+}
+
+PART_2_ARRAY_OPERATIONS = {
+    "toggle": lambda region: np.add(region, 2, out=region),
+    "turn on": lambda region: np.add(region, 1, out=region),
+    "turn off": lambda region: np.subtract(region, 1, out=region, where=region > 0),
+}
+
+# Compiled instructions store an opcode in place of the operation name,
+# each opcode indexes the operation tables below
+OPERATIONS = ("turn on", "turn off", "toggle")
+OPCODES = {operation: opcode for opcode, operation in enumerate(OPERATIONS)}
+
+PART_1_TABLE = tuple(PART_1_OPERATIONS[operation] for operation in OPERATIONS)
+PART_2_TABLE = tuple(PART_2_OPERATIONS[operation] for operation in OPERATIONS)
+PART_1_ARRAY_TABLE = tuple(
+    PART_1_ARRAY_OPERATIONS[operation] for operation in OPERATIONS
+)
+PART_2_ARRAY_TABLE = tuple(
+    PART_2_ARRAY_OPERATIONS[operation] for operation in OPERATIONS
+)
+
+# Bytes read from an instruction file at a time when streaming
+CHUNK_SIZE = 1024 * 1024
+
+# Default memory budget for a dense grid before falling back to tiles, 256 MiB
+DENSE_MEMORY_BUDGET = 256 * 1024 * 1024
+TILE_SIZE = 1024
+
 
 class GridSize(NamedTuple):
     minimum: int = 0
@@ -42,6 +89,13 @@ class Instruction(NamedTuple):
     stop_y: int
 
 
+class CompiledInstructions(NamedTuple):
+    """Instructions packed into flat arrays, one opcode byte and four int32 coordinates per instruction."""
+
+    opcodes: array
+    coordinates: array
+
+
 def parse_instruction(raw_instruction: str, point_seperator=",") -> Instruction:
     """Parse an instruction i.e. 'turn off 446,432 through 458,648' and return a properly formed Instruction NamedTuple"""
     left, stop_point = raw_instruction.split(" through ")
@@ -62,6 +116,92 @@ def parse_instructions(raw_instructions: List[str]) -> Iterator:
         yield parse_instruction(instruction)
 
 
+def compile_instructions(
+    instructions: Union[Sequence[Instruction], CompiledInstructions],
+) -> CompiledInstructions:
+    """Pack Instruction NamedTuples into CompiledInstructions, already compiled instructions are returned as is."""
+    if isinstance(instructions, CompiledInstructions):
+        return instructions
+
+    compiled = CompiledInstructions(array("B"), array("i"))
+    for instruction in instructions:
+        coordinates: array = pack_coordinates(instruction[1:])
+        compiled.opcodes.append(OPCODES[instruction.operation])
+        compiled.coordinates.extend(coordinates)
+
+    return compiled
+
+
+def pack_coordinates(coordinates: Sequence[int]) -> array:
+    """Return coordinates as an array("i"), raises ValueError if any of them don't fit in one."""
+    try:
+        return array("i", coordinates)
+    except OverflowError as error:
+        raise ValueError(f"Coordinates out of range: {tuple(coordinates)}") from error
+
+
+def compile_tokens(tokens: List[bytes], compiled: CompiledInstructions) -> None:
+    """Append the instructions from a list of whitespace separated tokens to compiled.
+
+    Commas must already be replaced with whitespace, i.e. 'turn off 446 432 through 458 648'.
+    """
+    idx: int = 0
+    while idx < len(tokens):
+        if tokens[idx] == b"toggle":
+            operation = "toggle"
+            idx += 1
+        elif tokens[idx] == b"turn" and tokens[idx + 1 : idx + 2] in (
+            [b"on"],
+            [b"off"],
+        ):
+            operation = f"turn {tokens[idx + 1].decode()}"
+            idx += 2
+        else:
+            raise ValueError(f"Invalid operation: {tokens[idx].decode()}")
+
+        if idx + 5 > len(tokens) or tokens[idx + 2] != b"through":
+            raise ValueError(
+                f"Invalid instruction: {b' '.join(tokens[idx : idx + 5])!r}"
+            )
+
+        coordinates: array = pack_coordinates(
+            (
+                int(tokens[idx]),
+                int(tokens[idx + 1]),
+                int(tokens[idx + 3]),
+                int(tokens[idx + 4]),
+            )
+        )
+        compiled.opcodes.append(OPCODES[operation])
+        compiled.coordinates.extend(coordinates)
+        idx += 5
+
+
+def stream_instructions(
+    filename: str, chunk_size: int = CHUNK_SIZE
+) -> CompiledInstructions:
+    """Parse an instruction file chunk_size bytes at a time straight into CompiledInstructions."""
+    compiled = CompiledInstructions(array("B"), array("i"))
+    remainder: bytes = b""
+
+    with open(filename, "rb") as instructions_file:
+        while chunk := instructions_file.read(chunk_size):
+            # Hold back the trailing partial line until the next chunk completes it
+            complete, _, partial = (remainder + chunk).rpartition(b"\n")
+            compile_tokens(complete.replace(b",", b" ").split(), compiled)
+            remainder = partial
+
+    compile_tokens(remainder.replace(b",", b" ").split(), compiled)
+
+    return compiled
+
+
+def iter_compiled(compiled: CompiledInstructions) -> Iterator[Tuple[int, ...]]:
+    """Yield (opcode, start_x, start_y, stop_x, stop_y) for each compiled instruction."""
+    coordinates = iter(compiled.coordinates)
+    return zip(compiled.opcodes, coordinates, coordinates, coordinates, coordinates)
+
+
 def generate_coordinates(
     start_point: Tuple[int, int], stop_point: Tuple[int, int]
 ) -> Iterator[Tuple[int, int]]:
@@ -108,31 +248,366 @@ def process_instructions(
     return lights_state
 
 
-def main():
-    filename: str = sys.argv[1]
-    raw_instructions: List[str] = open(filename).readlines()
+class BoundingBox(NamedTuple):
+    min_x: int
+    min_y: int
+    max_x: int
+    max_y: int
 
-    instructions: Tuple[Instruction, ...] = tuple(parse_instructions(raw_instructions))
+    @property
+    def width(self) -> int:
+        return self.max_x - self.min_x + 1
 
-    lights_state: DefaultDict[Tuple[int, int], int] = process_instructions(
-        instructions, part_1=True
-    )
+    @property
+    def height(self) -> int:
+        return self.max_y - self.min_y + 1
 
-    # Count the number of turned on lights
-    turned_on_lights: int = reduce(
-        lambda total, state: total + (1 if state > 0 else 0),
-        lights_state.values(),
-        0,
-    )
 
-    print(f"Part 1 turned on lights: {turned_on_lights}")
+def coordinate_columns(compiled: CompiledInstructions) -> np.ndarray:
+    """Return a (instructions, 4) view of the compiled coordinates without copying them."""
+    return np.frombuffer(compiled.coordinates, dtype=np.intc).reshape(-1, 4)
+
+
+def bounding_box(compiled: CompiledInstructions) -> BoundingBox:
+    """Return the smallest box containing every instruction, raises ValueError if it exceeds GRID_SIZE."""
+    if not compiled.opcodes:
+        raise ValueError("Can't bound an empty set of instructions.")
 
-    lights_brightness: DefaultDict[Tuple[int, int], int] = process_instructions(
-        instructions, part_1=False
+    columns: np.ndarray = coordinate_columns(compiled)
+    box = BoundingBox(
+        int(columns[:, 0].min()),
+        int(columns[:, 1].min()),
+        int(columns[:, 2].max()),
+        int(columns[:, 3].max()),
     )
 
-    # Sum the total brightness
-    total_brightness: int = sum(lights_brightness.values())
+    if (
+        box.min_x < GRID_SIZE.minimum
+        or box.min_y < GRID_SIZE.minimum
+        or box.max_x > GRID_SIZE.maximum
+        or box.max_y > GRID_SIZE.maximum
+    ):
+        raise ValueError(f"{box} exceeds {GRID_SIZE} limit.")
+
+    return box
+
+
+def compress_axis(starts: Sequence[int], stops: Sequence[int]) -> List[int]:
+    """Return the sorted boundaries that split an axis into segments every instruction either covers or misses entirely.
+
+    Instructions are inclusive so each segment ends just before the next boundary.
+    """
+    return sorted(set(starts) | {stop + 1 for stop in stops})
+
+
+def process_instructions_compressed(
+    instructions: Union[Sequence[Instruction], CompiledInstructions], part_1
+) -> int:
+    """Apply every instruction to the compressed grid and return the lit count (part 1) or total brightness (part 2).
+
+    The plane is split into the rectangles formed by the instruction edges, every point in one of these cells
+    shares a state so each cell is updated once per instruction and weighted by its area at the end.
+    """
+    compiled: CompiledInstructions = compile_instructions(instructions)
+    if not compiled.opcodes:
+        return 0
+
+    # Validates every instruction against GRID_SIZE up front
+    bounding_box(compiled)
+
+    columns: np.ndarray = coordinate_columns(compiled)
+    x_edges: List[int] = compress_axis(columns[:, 0].tolist(), columns[:, 2].tolist())
+    y_edges: List[int] = compress_axis(columns[:, 1].tolist(), columns[:, 3].tolist())
+
+    if part_1:
+        operations_table = PART_1_TABLE
+    else:
+        operations_table = PART_2_TABLE
+
+    # One row of cell states for each x segment
+    cells: List[List[int]] = [[0] * (len(y_edges) - 1) for _ in x_edges[:-1]]
+
+    for opcode, start_x, start_y, stop_x, stop_y in iter_compiled(compiled):
+        operation: Callable = operations_table[opcode]
+
+        # Every instruction edge is a boundary so these lookups are exact
+        first_row: int = bisect_left(x_edges, start_x)
+        last_row: int = bisect_left(x_edges, stop_x + 1)
+        first_column: int = bisect_left(y_edges, start_y)
+        last_column: int = bisect_left(y_edges, stop_y + 1)
+
+        for row in cells[first_row:last_row]:
+            row[first_column:last_column] = [
+                operation(state) for state in row[first_column:last_column]
+            ]
+
+    total: int = 0
+    for row_idx, row in enumerate(cells):
+        width: int = x_edges[row_idx + 1] - x_edges[row_idx]
+        for column_idx, state in enumerate(row):
+            if not state:
+                continue
+
+            height: int = y_edges[column_idx + 1] - y_edges[column_idx]
+
+            # Part 1 counts lit points, part 2 sums their brightness
+            total += width * height * (1 if part_1 else state)
+
+    return total
+
+
+class DenseGrid:
+    """A single NumPy array covering the bounding box of the instructions."""
+
+    def __init__(
+        self, box: BoundingBox, dtype, memory_budget: int = DENSE_MEMORY_BUDGET
+    ) -> None:
+        needed: int = box.width * box.height * np.dtype(dtype).itemsize
+        if needed > memory_budget:
+            raise MemoryError(
+                f"A dense grid needs {needed} bytes, over the {memory_budget} byte budget"
+            )
+
+        self.box = box
+        self.lights = np.zeros((box.width, box.height), dtype=dtype)
+
+    def apply(
+        self, operation: Callable, start_x: int, start_y: int, stop_x: int, stop_y: int
+    ) -> None:
+        """Run the array operation over the instruction's rectangle."""
+        # Shift into array coordinates, the array starts at the bounding box corner
+        start_x -= self.box.min_x
+        stop_x -= self.box.min_x
+        start_y -= self.box.min_y
+        stop_y -= self.box.min_y
+
+        operation(self.lights[start_x : stop_x + 1, start_y : stop_y + 1])
+
+    def total(self, part_1) -> int:
+        """Return the number of lit points (part 1) or the total brightness (part 2)."""
+        if part_1:
+            return int(np.count_nonzero(self.lights))
+
+        return int(self.lights.sum(dtype=np.uint64))
+
+    @property
+    def nbytes(self) -> int:
+        return self.lights.nbytes
+
+
+class TiledGrid:
+    """A sparse grid of fixed size NumPy tiles, a tile is only allocated once an instruction touches part of it.
+
+    A tile that instructions only ever covered whole, or that ended up uniform, is kept as a single value
+    instead of an array, so e.g. turning on the whole 1M x 1M grid takes no tile arrays at all. Tiles are
+    clipped to the bounding box, points outside it are never lit. Raises MemoryError when the tile arrays
+    would outgrow memory_budget bytes, the index of uniform tiles isn't counted against it.
+    """
+
+    def __init__(
+        self,
+        box: BoundingBox,
+        dtype,
+        tile_size: int = TILE_SIZE,
+        memory_budget: int = DENSE_MEMORY_BUDGET,
+    ) -> None:
+        self.box = box
+        self.dtype = dtype
+        self.tile_size = tile_size
+        self.memory_budget = memory_budget
+        # Missing tiles are all 0
+        self.tiles: Dict[Tuple[int, int], Union[np.ndarray, int]] = {}
+        self.nbytes: int = 0
+        self.peak_nbytes: int = 0
+
+    def region(self, tile_x: int, tile_y: int) -> Tuple[slice, slice]:
+        """Return the tile local slices of the tile's points inside the bounding box."""
+        offset_x = tile_x * self.tile_size
+        offset_y = tile_y * self.tile_size
+
+        return (
+            slice(
+                max(self.box.min_x - offset_x, 0),
+                min(self.box.max_x - offset_x, self.tile_size - 1) + 1,
+            ),
+            slice(
+                max(self.box.min_y - offset_y, 0),
+                min(self.box.max_y - offset_y, self.tile_size - 1) + 1,
+            ),
+        )
+
+    def tile(self, tile_x: int, tile_y: int) -> np.ndarray:
+        """Return the tile at the given tile coordinates as an array, allocating it if needed."""
+        key = (tile_x, tile_y)
+        tile = self.tiles.get(key, 0)
+        if isinstance(tile, np.ndarray):
+            return tile
+
+        tile_bytes: int = (
+            self.tile_size * self.tile_size * np.dtype(self.dtype).itemsize
+        )
+        if self.nbytes + tile_bytes > self.memory_budget:
+            raise MemoryError(
+                f"Tiles need more than the {self.memory_budget} byte budget, {self.nbytes} bytes in use"
+            )
+
+        self.nbytes += tile_bytes
+        self.peak_nbytes = max(self.peak_nbytes, self.nbytes)
+        self.tiles[key] = np.zeros((self.tile_size, self.tile_size), self.dtype)
+        self.tiles[key][self.region(tile_x, tile_y)] = tile
+
+        return self.tiles[key]
+
+    def apply_whole(
+        self, operation: Callable, tile_x: int, tile_y: int, results: Dict[int, int]
+    ) -> None:
+        """Run the array operation over all of a tile, results caches the operation on uniform tiles."""
+        key = (tile_x, tile_y)
+        tile = self.tiles.get(key, 0)
+
+        if isinstance(tile, np.ndarray):
+            inside: np.ndarray = tile[self.region(tile_x, tile_y)]
+            operation(inside)
+            if inside.min() != inside.max():
+                return
+
+            # Release tiles the operation left uniform
+            self.nbytes -= tile.nbytes
+            tile = int(inside[0, 0])
+        else:
+            if tile not in results:
+                value = np.full((1, 1), tile, self.dtype)
+                operation(value)
+                results[tile] = int(value[0, 0])
+            tile = results[tile]
+
+        if tile:
+            self.tiles[key] = tile
+        else:
+            self.tiles.pop(key, None)
+
+    def apply(
+        self, operation: Callable, start_x: int, start_y: int, stop_x: int, stop_y: int
+    ) -> None:
+        """Run the array operation over the part of the instruction's rectangle inside each tile it overlaps."""
+        size = self.tile_size
+        results: Dict[int, int] = {}
+
+        for tile_x in range(start_x // size, stop_x // size + 1):
+            # Clamp the rectangle to this tile and convert it to tile local coordinates
+            offset_x = tile_x * size
+            local_start_x = max(start_x, offset_x) - offset_x
+            local_stop_x = min(stop_x, offset_x + size - 1) - offset_x
+
+            for tile_y in range(start_y // size, stop_y // size + 1):
+                offset_y = tile_y * size
+                local_start_y = max(start_y, offset_y) - offset_y
+                local_stop_y = min(stop_y, offset_y + size - 1) - offset_y
+
+                inside_x, inside_y = self.region(tile_x, tile_y)
+                if (
+                    local_start_x,
+                    local_stop_x + 1,
+                    local_start_y,
+                    local_stop_y + 1,
+                ) == (
+                    inside_x.start,
+                    inside_x.stop,
+                    inside_y.start,
+                    inside_y.stop,
+                ):
+                    self.apply_whole(operation, tile_x, tile_y, results)
+                    continue
+
+                operation(
+                    self.tile(tile_x, tile_y)[
+                        local_start_x : local_stop_x + 1,
+                        local_start_y : local_stop_y + 1,
+                    ]
+                )
+
+    def total(self, part_1) -> int:
+        """Return the number of lit points (part 1) or the total brightness (part 2)."""
+        total: int = 0
+        for (tile_x, tile_y), tile in self.tiles.items():
+            if isinstance(tile, np.ndarray):
+                if part_1:
+                    total += int(np.count_nonzero(tile))
+                else:
+                    total += int(tile.sum(dtype=np.uint64))
+                continue
+
+            # Uniform tiles were covered whole, every point inside the bounding box has the value
+            inside_x, inside_y = self.region(tile_x, tile_y)
+            area: int = (inside_x.stop - inside_x.start) * (
+                inside_y.stop - inside_y.start
+            )
+            total += area * (1 if part_1 else tile)
+
+        return total
+
+
+GRID_BACKENDS = {
+    "dense": DenseGrid,
+    "tiled": TiledGrid,
+}
+
+
+def select_backend(
+    box: BoundingBox, dtype, memory_budget: int = DENSE_MEMORY_BUDGET
+) -> str:
+    """Return the name of the dense backend if the bounding box fits in memory_budget bytes, otherwise tiled."""
+    if box.width * box.height * np.dtype(dtype).itemsize <= memory_budget:
+        return "dense"
+
+    return "tiled"
+
+
+def process_instructions_array(
+    instructions: Union[Sequence[Instruction], CompiledInstructions],
+    part_1,
+    backend=None,
+    memory_budget: int = DENSE_MEMORY_BUDGET,
+    tile_size: int = TILE_SIZE,
+):
+    """Apply every instruction to a NumPy grid backend and return the grid.
+
+    backend: A key of GRID_BACKENDS, picked from the instructions bounding box when not provided.
+    memory_budget: Bytes either backend may allocate, raises MemoryError past it.
+    """
+    compiled: CompiledInstructions = compile_instructions(instructions)
+    box: BoundingBox = bounding_box(compiled)
+
+    # Part 1 lights are only ever 0 or 1, brightness can keep climbing
+    if part_1:
+        dtype = np.uint8
+        operations_table = PART_1_ARRAY_TABLE
+    else:
+        dtype = np.uint32
+        operations_table = PART_2_ARRAY_TABLE
+
+    if backend is None:
+        backend = select_backend(box, dtype, memory_budget)
+
+    if backend == "tiled":
+        grid = TiledGrid(box, dtype, tile_size, memory_budget)
+    else:
+        grid = GRID_BACKENDS[backend](box, dtype, memory_budget)
+
+    for opcode, start_x, start_y, stop_x, stop_y in iter_compiled(compiled):
+        grid.apply(operations_table[opcode], start_x, start_y, stop_x, stop_y)
+
+    return grid
+
+
+def main():
+    filename: str = sys.argv[1]
+    instructions: CompiledInstructions = stream_instructions(filename)
+
+    turned_on_lights: int = process_instructions_compressed(instructions, part_1=True)
+    print(f"Part 1 turned on lights: {turned_on_lights}")
+
+    total_brightness: int = process_instructions_compressed(instructions, part_1=False)
     print(f"Part 2 total brightness: {total_brightness}")
 
 
@@ -1,6 +1,25 @@
 import pytest
 
-from day06 import generate_coordinates, parse_instruction, Instruction
+from day06 import (
+    compile_instructions,
+    generate_coordinates,
+    parse_instruction,
+    process_instructions,
+    process_instructions_array,
+    process_instructions_compressed,
+    stream_instructions,
+    Instruction,
+    TiledGrid,
+)
+
+SAMPLE_INSTRUCTIONS = (
+    Instruction("turn on", 0, 0, 9, 9),
+    Instruction("toggle", 3, 0, 12, 4),
+    Instruction("turn off", 5, 5, 6, 20),
+    Instruction("toggle", 0, 2, 2, 3),
+    Instruction("turn off", 8, 8, 8, 8),
+    Instruction("turn on", 4, 4, 4, 4),
+)
 
 
 @pytest.mark.parametrize(
@@ -21,4 +40,134 @@ def test_parse_instruction(instruction, expected):
 )
 def test_parse_instruction_exceptions(instruction, expectation):
     with expectation:
-        parse_instruction(instruction)
\ No newline at end of file
+        parse_instruction(instruction)
+
+
+@pytest.mark.parametrize("part_1", [True, False])
+def test_process_instructions_compressed(part_1):
+    lights_state = process_instructions(SAMPLE_INSTRUCTIONS, part_1)
+    if part_1:
+        expected = sum(1 for state in lights_state.values() if state > 0)
+    else:
+        expected = sum(lights_state.values())
+
+    assert process_instructions_compressed(SAMPLE_INSTRUCTIONS, part_1) == expected
+
+
+def test_process_instructions_compressed_exceptions():
+    with pytest.raises(ValueError):
+        process_instructions_compressed(
+            [Instruction("turn on", 0, 0, 1_000_000, 1)], part_1=True
+        )
+
+
+@pytest.mark.parametrize("part_1", [True, False])
+@pytest.mark.parametrize("backend", [None, "dense", "tiled"])
+def test_process_instructions_array(part_1, backend):
+    grid = process_instructions_array(SAMPLE_INSTRUCTIONS, part_1, backend=backend)
+
+    assert grid.total(part_1) == process_instructions_compressed(
+        SAMPLE_INSTRUCTIONS, part_1
+    )
+
+
+def test_process_instructions_array_backend_selection():
+    # A 21 x 13 part 1 grid needs 273 bytes
+    assert process_instructions_array(SAMPLE_INSTRUCTIONS, True).nbytes == 273
+    grid = process_instructions_array(
+        SAMPLE_INSTRUCTIONS, True, memory_budget=200, tile_size=4
+    )
+    assert isinstance(grid, TiledGrid)
+    assert grid.total(True) == process_instructions_compressed(
+        SAMPLE_INSTRUCTIONS, True
+    )
+    assert grid.peak_nbytes <= 200
+
+
+@pytest.mark.parametrize("part_1", [True, False])
+@pytest.mark.parametrize("tile_size", [1, 2, 3, 4, 16])
+def test_tiled_grid_tile_sizes(part_1, tile_size):
+    grid = process_instructions_array(
+        SAMPLE_INSTRUCTIONS, part_1, backend="tiled", tile_size=tile_size
+    )
+
+    assert grid.total(part_1) == process_instructions_compressed(
+        SAMPLE_INSTRUCTIONS, part_1
+    )
+
+
+@pytest.mark.parametrize("part_1", [True, False])
+def test_tiled_grid_keeps_covered_tiles_uniform(part_1):
+    instructions = [
+        Instruction("turn on", 0, 0, 999_999, 999_999),
+        Instruction("toggle", 0, 0, 999_999, 999_999),
+        Instruction("turn on", 0, 0, 999_999, 999_999),
+    ]
+    grid = process_instructions_array(
+        instructions, part_1, backend="tiled", tile_size=100_000
+    )
+
+    assert grid.total(part_1) == 10**12 * (1 if part_1 else 4)
+    assert grid.nbytes == 0
+
+
+def test_tiled_grid_releases_tiles_left_uniform():
+    instructions = [
+        Instruction("turn on", 0, 0, 2, 2),
+        Instruction("turn off", 0, 0, 3, 3),
+    ]
+    grid = process_instructions_array(instructions, True, backend="tiled", tile_size=4)
+
+    assert grid.total(True) == 0
+    assert grid.peak_nbytes == 16
+    assert grid.nbytes == 0
+
+
+@pytest.mark.parametrize("backend", ["dense", "tiled"])
+def test_process_instructions_array_memory_budget(backend):
+    with pytest.raises(MemoryError):
+        process_instructions_array(
+            SAMPLE_INSTRUCTIONS, False, backend=backend, memory_budget=100, tile_size=8
+        )
+
+
+RAW_SAMPLE_INSTRUCTIONS = """turn on 0,0 through 9,9
+toggle 3,0 through 12,4
+turn off 5,5 through 6,20
+toggle 0,2 through 2,3
+turn off 8,8 through 8,8
+turn on 4,4 through 4,4"""
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1024])
+def test_stream_instructions(tmp_path, chunk_size):
+    filename = tmp_path / "input.txt"
+    filename.write_text(RAW_SAMPLE_INSTRUCTIONS)
+
+    assert stream_instructions(filename, chunk_size) == compile_instructions(
+        SAMPLE_INSTRUCTIONS
+    )
+
+
+@pytest.mark.parametrize(
+    "contents",
+    [
+        "not a real instruction 12,384 through 43,583\n",
+        "toggle 1,2\n",
+        "turn on 0,0 through 9,9\nturn off 1,2 through 3\n",
+        "turn\n",
+        "turn on 0,0 through 9999999999,1\n",
+        "toggle -2147483649,0 through 1,1\n",
+    ],
+)
+def test_stream_instructions_exceptions(tmp_path, contents):
+    filename = tmp_path / "input.txt"
+    filename.write_text(contents)
+
+    with pytest.raises(ValueError):
+        stream_instructions(filename)
+
+
+def test_compile_instructions_rejects_overflowing_coordinates():
+    with pytest.raises(ValueError):
+        compile_instructions([Instruction("turn on", 0, 0, 2**31, 1)])
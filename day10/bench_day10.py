@@ -0,0 +1,58 @@
+import sys
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+from day10 import look_say_bytes, look_say_n_times, stream_look_say
+
+
+def groupby_length(sequence: str, times: int) -> int:
+    return len(look_say_n_times(sequence, times))
+
+
+def bytes_length(sequence: str, times: int) -> int:
+    return len(look_say_bytes(sequence.encode("ascii"), times))
+
+
+def stream_length(sequence: str, times: int) -> int:
+    return sum(len(chunk) for chunk in stream_look_say(sequence.encode("ascii"), times))
+
+
+def measure(
+    length_func: Callable[[str, int], int], sequence: str, times: int
+) -> Tuple[int, float, int]:
+    """Return the sequence length, seconds taken and peak traced memory in bytes for length_func."""
+    tracemalloc.start()
+    started = time.perf_counter()
+
+    length = length_func(sequence, times)
+
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return length, seconds, peak
+
+
+def main():
+    sequence: str = sys.argv[1] if len(sys.argv) > 1 else "1113222113"
+
+    for times in (40, 50):
+        lengths = set()
+        for name, length_func in (
+            ("groupby", groupby_length),
+            ("bytes", bytes_length),
+            ("stream", stream_length),
+        ):
+            length, seconds, peak = measure(length_func, sequence, times)
+            lengths.add(length)
+            print(
+                f"{times} iterations {name:>8}: {seconds:6.2f}s, "
+                f"peak {peak / 1024 / 1024:7.1f} MiB"
+            )
+
+        assert len(lengths) == 1
+
+
+if __name__ == "__main__":
+    main()
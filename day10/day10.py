@@ -1,7 +1,22 @@
+from array import array
+from collections import Counter
 from itertools import groupby
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import sys
 
+import numpy as np
+
+# Iterations a split between two elements is checked for before it's trusted,
+# and the number of leading digits of the right hand element evolved to check it
+SPLIT_DEPTH = 50
+PREFIX_LENGTH = 32
+
+# Bytes per chunk handed between iterations when streaming a sequence
+CHUNK_SIZE = 64 * 1024
+
+# Give up on the element engine if the seed's elements keep decaying into new ones
+MAX_ELEMENTS = 1_000
+
 
 def look_say(sequence: str) -> str:
     """Generate the next sequence."""
@@ -22,18 +37,263 @@ def look_say_n_times(sequence: str, times: int) -> str:
     return sequence
 
 
+def evolves_independently(left_last: str, right: str) -> bool:
+    """Return whether a sequence ending in left_last and right can be look and said separately.
+
+    Look and say preserves the last digit of a sequence, so the two halves never merge as long as the first
+    digit of right never equals left_last. Only a prefix of right is evolved, the output for its last run is
+    dropped each iteration as that run may continue past the prefix.
+    """
+    prefix: str = right[:PREFIX_LENGTH]
+    exact: bool = len(right) <= PREFIX_LENGTH
+
+    for _ in range(SPLIT_DEPTH):
+        # An empty prefix means we lost track of the first digit, so don't split
+        if not prefix or prefix[0] == left_last:
+            return False
+
+        prefix = look_say(prefix)
+        if not exact:
+            prefix = prefix[:-2]
+
+        if len(prefix) > PREFIX_LENGTH:
+            prefix = prefix[:PREFIX_LENGTH]
+            exact = False
+
+    return True
+
+
+def split_elements(sequence: str) -> List[str]:
+    """Split the sequence into the smallest elements that evolve independently of each other."""
+    elements: List[str] = []
+    start: int = 0
+
+    for idx in range(1, len(sequence)):
+        # A split inside a run of the same digit can never be independent
+        if sequence[idx - 1] == sequence[idx]:
+            continue
+
+        if evolves_independently(sequence[idx - 1], sequence[idx:]):
+            elements.append(sequence[start:idx])
+            start = idx
+
+    elements.append(sequence[start:])
+
+    return elements
+
+
+def build_decay_table(
+    elements: List[str], max_elements: int = MAX_ELEMENTS
+) -> Optional[Dict[str, Tuple[str, ...]]]:
+    """Return the elements each element decays into for every element reachable from elements.
+
+    Returns None if more than max_elements are reachable.
+    """
+    decays: Dict[str, Tuple[str, ...]] = {}
+    pending: List[str] = list(elements)
+
+    while pending:
+        element: str = pending.pop()
+        if element in decays:
+            continue
+
+        if len(decays) >= max_elements:
+            return None
+
+        decays[element] = tuple(split_elements(look_say(element)))
+        pending.extend(decays[element])
+
+    return decays
+
+
+def look_say_runs(runs: array) -> array:
+    """Return the next sequence from a run length encoded one, both as flat (count, digit) pairs.
+
+    Counts are stored as unsigned 64 bit integers, a seed can hold runs far longer than a byte can count.
+    """
+    new_runs = array("Q")
+
+    for idx in range(0, len(runs), 2):
+        count, digit = runs[idx], runs[idx + 1]
+
+        # Say the count's digits then the digit itself
+        for said in (*map(int, str(count)), digit):
+            if new_runs and new_runs[-1] == said:
+                new_runs[-2] += 1
+            else:
+                new_runs.extend((1, said))
+
+    return new_runs
+
+
+def look_say_length_runs(sequence: str, times: int) -> int:
+    """Return the length of the sequence after look and say n times, tracked as a run length encoding."""
+    runs = array(
+        "Q",
+        (
+            value
+            for char, group in groupby(sequence)
+            for value in (len(tuple(group)), int(char))
+        ),
+    )
+
+    for _ in range(times):
+        runs = look_say_runs(runs)
+
+    return sum(runs[0::2])
+
+
+def look_say_length(sequence: str, times: int) -> int:
+    """Return the length of the sequence after look and say n times without building the sequence.
+
+    The sequence is split into Conway's elements, which evolve independently, and only the count of each
+    element is tracked. Seeds that don't decompose into a bounded set of elements fall back to a run length
+    encoding of the whole sequence.
+    """
+    decays = build_decay_table(split_elements(sequence))
+    if decays is None:
+        return look_say_length_runs(sequence, times)
+
+    counts: Counter = Counter(split_elements(sequence))
+    for _ in range(times):
+        new_counts: Counter = Counter()
+        for element, count in counts.items():
+            for decayed in decays[element]:
+                new_counts[decayed] += count
+
+        counts = new_counts
+
+    return sum(len(element) * count for element, count in counts.items())
+
+
+def run_starts(digits: np.ndarray) -> np.ndarray:
+    """Return the index each run of identical digits starts at."""
+    if not len(digits):
+        return np.empty(0, dtype=np.intp)
+
+    return np.concatenate(([0], np.flatnonzero(np.diff(digits)) + 1))
+
+
+def say_runs(digits: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Return the next sequence for an array of ASCII digits, written into out when provided.
+
+    out must hold at least twice as many bytes as digits and can't share memory with it.
+    """
+    # Like look_say, nothing is said about an empty sequence
+    if not len(digits):
+        return np.empty(0, dtype=np.uint8) if out is None else out[:0]
+
+    starts: np.ndarray = run_starts(digits)
+    counts: np.ndarray = np.diff(np.append(starts, len(digits)))
+
+    # Counts over 9 only happen in seeds, say them the slow way
+    if counts.max() > 9:
+        said = np.frombuffer(
+            look_say(digits.tobytes().decode("ascii")).encode("ascii"), dtype=np.uint8
+        )
+        if out is None:
+            return said.copy()
+
+        out[: len(said)] = said
+        return out[: len(said)]
+
+    if out is None:
+        out = np.empty(len(starts) * 2, dtype=np.uint8)
+
+    said = out[: len(starts) * 2]
+    said[0::2] = counts + ord("0")
+    said[1::2] = digits[starts]
+
+    return said
+
+
+def look_say_bytes(sequence: bytes, times: int) -> bytes:
+    """Perform look and say n times on a bytes sequence, alternating between two preallocated buffers."""
+    digits = np.frombuffer(sequence, dtype=np.uint8)
+
+    # Each iteration is at most twice as long as the last, only grow a buffer when it can't hold that
+    buffers: List[np.ndarray] = [
+        np.empty(0, dtype=np.uint8),
+        np.empty(0, dtype=np.uint8),
+    ]
+    for iteration in range(times):
+        buffer: np.ndarray = buffers[iteration % 2]
+        if len(buffer) < len(digits) * 2:
+            buffer = buffers[iteration % 2] = np.empty(len(digits) * 3, dtype=np.uint8)
+
+        digits = say_runs(digits, buffer)
+
+    return digits.tobytes()
+
+
+def look_say_chunks(
+    chunks: Iterable[bytes], chunk_size: int = CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Yield the next sequence in chunks of at most chunk_size bytes from the chunks of the current one."""
+    carry: bytes = b""
+
+    for chunk in chunks:
+        digits = np.frombuffer(carry + chunk, dtype=np.uint8)
+        if not len(digits):
+            continue
+
+        # The last run may continue into the next chunk so hold it back
+        last_start: int = int(run_starts(digits)[-1])
+        carry = digits[last_start:].tobytes()
+        if not last_start:
+            continue
+
+        said: bytes = say_runs(digits[:last_start]).tobytes()
+        for start in range(0, len(said), chunk_size):
+            yield said[start : start + chunk_size]
+
+    if carry:
+        yield say_runs(np.frombuffer(carry, dtype=np.uint8)).tobytes()
+
+
+def stream_look_say(
+    sequence: bytes, times: int, chunk_size: int = CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Yield the sequence after look and say n times in chunks, without holding any iteration in memory.
+
+    Every iteration is a generator consuming the chunks of the one before it.
+    """
+    chunks: Iterable[bytes] = (
+        sequence[start : start + chunk_size]
+        for start in range(0, len(sequence), chunk_size)
+    )
+
+    for _ in range(times):
+        chunks = look_say_chunks(chunks, chunk_size)
+
+    return iter(chunks)
+
+
+def write_look_say(
+    sequence: bytes, times: int, filename: str, chunk_size: int = CHUNK_SIZE
+) -> int:
+    """Write the sequence after look and say n times to filename a chunk at a time and return its length."""
+    length: int = 0
+    with open(filename, "wb") as sequence_file:
+        for chunk in stream_look_say(sequence, times, chunk_size):
+            sequence_file.write(chunk)
+            length += len(chunk)
+
+    return length
+
+
 def main():
     filename: str = sys.argv[1]
     sequence: str = open(filename).read().strip()
 
     assert look_say_n_times("1", 5) == "312211"
 
-    part_1: int = len(look_say_n_times(sequence, 40))
+    part_1: int = look_say_length(sequence, 40)
     print(f"Part 1: {part_1}")
 
-    part_2: int = len(look_say_n_times(sequence, 50))
+    part_2: int = look_say_length(sequence, 50)
     print(f"Part 2: {part_2}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
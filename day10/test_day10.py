@@ -0,0 +1,45 @@
+import pytest
+
+from day10 import (
+    look_say_bytes,
+    look_say_length,
+    look_say_length_runs,
+    look_say_n_times,
+    stream_look_say,
+)
+
+
+@pytest.mark.parametrize("sequence", ["1", "11", "1113222113", "3113322113", "22"])
+@pytest.mark.parametrize("times", [0, 1, 5, 25])
+def test_look_say_length(sequence, times):
+    expected = len(look_say_n_times(sequence, times))
+
+    assert look_say_length(sequence, times) == expected
+    assert look_say_length_runs(sequence, times) == expected
+
+
+@pytest.mark.parametrize(
+    "sequence", ["1" * 300, "2" * 256 + "3" * 1000 + "1", "9" * 70000]
+)
+@pytest.mark.parametrize("times", [0, 1, 3, 10])
+def test_look_say_length_long_runs(sequence, times):
+    expected = len(look_say_n_times(sequence, times))
+
+    assert look_say_length(sequence, times) == expected
+    assert look_say_length_runs(sequence, times) == expected
+
+
+def test_look_say_length_puzzle_answers():
+    assert look_say_length("1113222113", 40) == 252594
+    assert look_say_length("1113222113", 50) == 3579328
+
+
+@pytest.mark.parametrize("sequence", ["", "1", "1113222113", "1111111111111"])
+@pytest.mark.parametrize("chunk_size", [1, 3, 1024])
+def test_look_say_bytes(sequence, chunk_size):
+    expected = look_say_n_times(sequence, 12).encode("ascii")
+
+    assert look_say_bytes(sequence.encode("ascii"), 12) == expected
+    assert (
+        b"".join(stream_look_say(sequence.encode("ascii"), 12, chunk_size)) == expected
+    )
@@ -3,9 +3,17 @@ from itertools import tee
 import re
 
 from pprint import pprint
-from typing import Sequence, Callable, List, Tuple
+from typing import Sequence, Callable, Dict, List, Optional, Tuple
 import math
 import sys
+import time
+
+import numpy as np
+
+ALPHABET = string.ascii_lowercase
+
+# Candidates generated and validated at once by the batched search
+BATCH_SIZE = 100_000
 
 
 def wrap_char(char: str, high: str = "z") -> Tuple[str, bool]:
@@ -88,12 +96,13 @@ def is_valid_password(password: str, requirements) -> bool:
 def find_next_valid_password(
     starting_password, requirements, iter_limit=math.inf
 ) -> str:
-    """Increment the starting password until a valid password is found or """
+    """Increment the starting password until a valid password is found or"""
 
     next_password: str = increment_password(starting_password)
     iteration: int = 0
     while not is_valid_password(next_password, requirements):
         next_password = increment_password(next_password)
+        iteration += 1
 
         if iteration > iter_limit:
             break
@@ -101,24 +110,373 @@ def find_next_valid_password(
     return next_password
 
 
+# Got fancy in part 1 with the expectation that the password requirements would change.
+REQUIREMENTS = (
+    (is_valid_length, (), {}),
+    (no_invalid_letters, (), {}),
+    (has_valid_char_run, (), {}),
+    (has_valid_letter_pairs, (), {}),
+)
+
+
+def straight_possible(
+    prefix: List[int], length: int, run_length: int, not_allowed: str
+) -> bool:
+    """Return whether the prefix could still be completed with a run of run_length consecutive letters.
+
+    Runs are only looked for at the same starting positions has_valid_char_run checks.
+    """
+    for start in range(0, length - run_length):
+        # The first letter of the run, pinned down by the first position already in the prefix
+        first: Optional[int] = None
+        consistent: bool = True
+
+        for offset in range(run_length):
+            position: int = start + offset
+            if position >= len(prefix):
+                break
+
+            if first is None:
+                first = prefix[position] - offset
+            elif prefix[position] != first + offset:
+                consistent = False
+                break
+
+        if not consistent:
+            continue
+
+        candidates = (
+            range(len(ALPHABET) - run_length + 1) if first is None else (first,)
+        )
+        for candidate in candidates:
+            if 0 <= candidate <= len(ALPHABET) - run_length and not any(
+                ALPHABET[candidate + offset] in not_allowed
+                for offset in range(run_length)
+            ):
+                return True
+
+    return False
+
+
+def pairs_possible(prefix: List[int], length: int, required_pairs: int) -> bool:
+    """Return whether the prefix could still be completed with required_pairs non overlapping letter pairs."""
+    pairs: int = 0
+    idx: int = 0
+
+    # Taking the leftmost pair first never leaves fewer pairs
+    while idx < len(prefix) - 1:
+        if prefix[idx] == prefix[idx + 1]:
+            pairs += 1
+            idx += 2
+        else:
+            idx += 1
+
+    free: int = length - len(prefix)
+    if free and idx == len(prefix) - 1:
+        # The unpaired last letter can pair with the first free position
+        pairs += 1 + (free - 1) // 2
+    else:
+        pairs += free // 2
+
+    return pairs >= required_pairs
+
+
+def find_valid_from(
+    lower: List[int],
+    requirements,
+    length: int = 8,
+    run_length: int = 3,
+    required_pairs: int = 2,
+    not_allowed: str = "iol",
+) -> Optional[str]:
+    """Return the first valid password at or after lower, a password as a list of letter indexes.
+
+    Searches depth first in alphabetical order, jumping straight past not allowed letters and abandoning
+    any prefix that can no longer fit a run or enough pairs. Complete candidates are checked against
+    requirements so the result matches is_valid_password.
+    """
+    allowed: List[int] = [
+        idx for idx, letter in enumerate(ALPHABET) if letter not in not_allowed
+    ]
+    prefix: List[int] = []
+
+    def search(tight: bool) -> Optional[str]:
+        position: int = len(prefix)
+        if position == len(lower):
+            candidate: str = "".join(ALPHABET[idx] for idx in prefix)
+            return candidate if is_valid_password(candidate, requirements) else None
+
+        for letter in allowed:
+            if tight and letter < lower[position]:
+                continue
+
+            prefix.append(letter)
+            if straight_possible(
+                prefix, length, run_length, not_allowed
+            ) and pairs_possible(prefix, length, required_pairs):
+                found = search(tight and letter == lower[position])
+                if found is not None:
+                    return found
+
+            prefix.pop()
+
+        return None
+
+    return search(True)
+
+
+def find_next_valid_password_fast(
+    starting_password: str,
+    requirements,
+    length: int = 8,
+    run_length: int = 3,
+    required_pairs: int = 2,
+    not_allowed: str = "iol",
+) -> str:
+    """Return the same password as find_next_valid_password, skipping whole ranges of invalid passwords.
+
+    length, run_length, required_pairs and not_allowed must describe requirements, they're used to prune.
+    Raises ValueError if there is no valid password.
+    """
+    lower: List[int] = [
+        ALPHABET.index(char) for char in increment_password(starting_password)
+    ]
+
+    found: Optional[str] = find_valid_from(
+        lower, requirements, length, run_length, required_pairs, not_allowed
+    )
+
+    # Incrementing wraps from zzzzzzzz to aaaaaaaa
+    if found is None:
+        found = find_valid_from(
+            [0] * len(lower),
+            requirements,
+            length,
+            run_length,
+            required_pairs,
+            not_allowed,
+        )
+
+    if found is None:
+        raise ValueError(f"No valid password follows {starting_password}")
+
+    return found
+
+
+def encode_passwords(passwords: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Return a (passwords, longest) uint8 array of code points, zero padded, and each password's length."""
+    padded: np.ndarray = np.array(
+        [password.encode() for password in passwords], dtype=bytes
+    )
+    codes: np.ndarray = padded.view(np.uint8).reshape(len(passwords), padded.itemsize)
+    lengths: np.ndarray = np.fromiter(
+        map(len, passwords), dtype=np.int64, count=len(passwords)
+    )
+
+    return codes, lengths
+
+
+def batch_valid_length(codes: np.ndarray, lengths: np.ndarray, length=8) -> np.ndarray:
+    """is_valid_length for a batch of encoded passwords."""
+    return lengths == length
+
+
+def batch_no_invalid_letters(
+    codes: np.ndarray, lengths: np.ndarray, not_allowed=r"[iol]"
+) -> np.ndarray:
+    """no_invalid_letters for a batch of encoded passwords, not_allowed must match single characters."""
+    # Evaluate the pattern once for every possible byte instead of once per password
+    invalid = np.array(
+        [re.search(not_allowed, chr(code)) is not None for code in range(256)]
+    )
+    invalid[0] = False  # Padding
+
+    return ~invalid[codes].any(axis=1)
+
+
+def batch_has_valid_char_run(
+    codes: np.ndarray, lengths: np.ndarray, run_length=3
+) -> np.ndarray:
+    """has_valid_char_run for a batch of encoded passwords, checking the same starting positions."""
+    starts: int = codes.shape[1] - run_length + 1
+    if starts <= 0:
+        return np.zeros(len(codes), dtype=bool)
+
+    steps: np.ndarray = np.diff(codes.astype(np.int16), axis=1) == 1
+
+    runs = np.ones((len(codes), starts), dtype=bool)
+    for offset in range(run_length - 1):
+        runs &= steps[:, offset : offset + starts]
+
+    # has_valid_char_run only looks at starts before len(password) - run_length
+    checked = np.arange(starts) < (lengths - run_length)[:, None]
+
+    return (runs & checked).any(axis=1)
+
+
+def batch_has_valid_letter_pairs(codes: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """has_valid_letter_pairs for a batch of encoded passwords with its default pattern."""
+    letters = (codes >= ord("a")) & (codes <= ord("z"))
+    pairs: np.ndarray = (codes[:, :-1] == codes[:, 1:]) & letters[:, 1:]
+
+    # A second pair has to start at least two letters after the first pair
+    positions = np.arange(pairs.shape[1])
+    first = np.where(pairs.any(axis=1), pairs.argmax(axis=1), pairs.shape[1])
+
+    return (pairs & (positions >= first[:, None] + 2)).any(axis=1)
+
+
+def batch_fallback(func: Callable, args, kwargs) -> Callable:
+    """Return a batch check calling func on each decoded password, for requirements without a batch version."""
+
+    def check(codes: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        return np.fromiter(
+            (
+                bool(func(row[:length].tobytes().decode(), *args, **kwargs))
+                for row, length in zip(codes, lengths)
+            ),
+            dtype=bool,
+            count=len(codes),
+        )
+
+    return check
+
+
+def compile_requirement(func: Callable, args, kwargs) -> Callable:
+    """Return a batch check equivalent to func(password, *args, **kwargs)."""
+    if func is is_valid_length:
+        return lambda codes, lengths: batch_valid_length(
+            codes, lengths, *args, **kwargs
+        )
+
+    if func is no_invalid_letters:
+        not_allowed = (args or (kwargs.get("not_allowed", r"[iol]"),))[0]
+        # Only a character class can be checked one character at a time
+        if re.fullmatch(r"\[[^\]]+\]", not_allowed):
+            return lambda codes, lengths: batch_no_invalid_letters(
+                codes, lengths, not_allowed
+            )
+
+    if func is has_valid_char_run:
+        return lambda codes, lengths: batch_has_valid_char_run(
+            codes, lengths, *args, **kwargs
+        )
+
+    if func is has_valid_letter_pairs and not args and not kwargs:
+        return batch_has_valid_letter_pairs
+
+    return batch_fallback(func, args, kwargs)
+
+
+class RequirementStats:
+    """Runtime cost and rejections of one compiled requirement."""
+
+    def __init__(self) -> None:
+        self.checked: int = 0
+        self.rejected: int = 0
+        self.seconds: float = 0.0
+
+    def rank(self) -> float:
+        """Seconds spent per rejected candidate, cheap requirements that reject a lot go first."""
+        if not self.checked:
+            return 0.0
+
+        return self.seconds / self.checked / max(self.rejected / self.checked, 1e-9)
+
+
+class CompiledRequirements:
+    """A requirements spec compiled into batch checks over uint8 code point arrays.
+
+    Each batch only runs a requirement on the candidates that passed every earlier one, and the
+    requirements are reordered after each batch by their measured cost per rejection.
+    """
+
+    def __init__(self, requirements) -> None:
+        self.checks: List[Tuple[str, Callable]] = [
+            (func.__name__, compile_requirement(func, args, kwargs))
+            for func, args, kwargs in requirements
+        ]
+        self.stats: Dict[str, RequirementStats] = {
+            name: RequirementStats() for name, _ in self.checks
+        }
+
+    def validate_codes(self, codes: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """Return whether each encoded password meets every requirement."""
+        remaining: np.ndarray = np.arange(len(codes))
+
+        for name, check in self.checks:
+            if not len(remaining):
+                break
+
+            started: float = time.perf_counter()
+            passed: np.ndarray = check(codes[remaining], lengths[remaining])
+
+            stats: RequirementStats = self.stats[name]
+            stats.seconds += time.perf_counter() - started
+            stats.checked += len(remaining)
+            stats.rejected += int(len(remaining) - passed.sum())
+
+            remaining = remaining[passed]
+
+        self.checks.sort(key=lambda check: self.stats[check[0]].rank())
+
+        valid = np.zeros(len(codes), dtype=bool)
+        valid[remaining] = True
+
+        return valid
+
+    def validate(self, passwords: Sequence[str]) -> np.ndarray:
+        """Return whether each password meets every requirement."""
+        return self.validate_codes(*encode_passwords(passwords))
+
+
+def find_next_valid_password_batched(
+    starting_password: str, compiled: CompiledRequirements, batch_size: int = BATCH_SIZE
+) -> str:
+    """Return the same password as find_next_valid_password, validating batch_size candidates at a time.
+
+    Candidates are base 26 integers so a whole batch is generated at once and any requirements can be used.
+    Raises ValueError if no password of this length is valid.
+    """
+    length: int = len(starting_password)
+    space: int = len(ALPHABET) ** length
+    places: np.ndarray = len(ALPHABET) ** np.arange(length - 1, -1, -1, dtype=np.int64)
+
+    start: int = 0
+    for char in starting_password:
+        start = start * len(ALPHABET) + ALPHABET.index(char)
+
+    # Incrementing wraps from zzzzzzzz to aaaaaaaa, the starting password is checked last
+    for offset in range(1, space + 1, batch_size):
+        candidates = (
+            start
+            + np.arange(offset, min(offset + batch_size, space + 1), dtype=np.int64)
+        ) % space
+        codes = ((candidates[:, None] // places) % len(ALPHABET) + ord("a")).astype(
+            np.uint8
+        )
+        valid: np.ndarray = compiled.validate_codes(
+            codes, np.full(len(codes), length, dtype=np.int64)
+        )
+
+        if valid.any():
+            return codes[valid.argmax()].tobytes().decode()
+
+    raise ValueError(f"No valid password follows {starting_password}")
+
+
 def main():
     filename = sys.argv[1]
     password = open(filename).read().strip()
 
-    # Got fancy in part 1 with the expectation that the password requirements would change.
-    requirements = (
-        (is_valid_length, (), {}),
-        (no_invalid_letters, (), {}),
-        (has_valid_char_run, (), {}),
-        (has_valid_letter_pairs, (), {}),
-    )
+    requirements = REQUIREMENTS
 
-    next_password = find_next_valid_password(password, requirements)
+    next_password = find_next_valid_password_fast(password, requirements)
     print(f"Part 1 next password: {next_password}")
 
-    next_password = find_next_valid_password(next_password, requirements)
+    next_password = find_next_valid_password_fast(next_password, requirements)
     print(f"Part 2 next password: {next_password}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,4 +1,12 @@
+import pytest
+
 from day11 import (
+    REQUIREMENTS,
+    CompiledRequirements,
+    find_next_valid_password_batched,
+    is_valid_password,
+    find_next_valid_password,
+    find_next_valid_password_fast,
     increment_password,
     no_invalid_letters,
     has_valid_letter_pairs,
@@ -32,3 +40,37 @@ def test_lazy_testing():
     assert no_invalid_letters("abcdffaa")
     assert has_valid_letter_pairs("abcdffaa")
     assert has_valid_char_run("abcdffaa")
+
+
+@pytest.mark.parametrize(
+    "password, expected",
+    [("abcdefgh", "abcdffaa"), ("ghijklmn", "ghjaabcc"), ("hxbxwxba", "hxbxxyzz")],
+)
+def test_find_next_valid_password_fast(password, expected):
+    assert find_next_valid_password_fast(password, REQUIREMENTS) == expected
+
+
+@pytest.mark.parametrize("password", ["abcdffaa", "xxyzzaaa", "zzzzzzzz"])
+def test_find_next_valid_password_fast_matches_increment(password):
+    assert find_next_valid_password_fast(
+        password, REQUIREMENTS
+    ) == find_next_valid_password(password, REQUIREMENTS)
+
+
+def test_compiled_requirements():
+    passwords = ["abcdffaa", "ghjaabcc", "hijklmmn", "abbceffg", "abbcegjk", "xxabcdyy"]
+    passwords += ["abcdefgh", "aabbcd", "", "aabbxxxxxabc", "aabbxxxxxabcd"]
+    compiled = CompiledRequirements(REQUIREMENTS)
+
+    assert list(compiled.validate(passwords)) == [
+        is_valid_password(password, REQUIREMENTS) for password in passwords
+    ]
+
+
+@pytest.mark.parametrize(
+    "password, expected",
+    [("abcdefgh", "abcdffaa"), ("ghijklmn", "ghjaabcc"), ("zzzzzzzz", "aaaaabca")],
+)
+def test_find_next_valid_password_batched(password, expected):
+    compiled = CompiledRequirements(REQUIREMENTS)
+    assert find_next_valid_password_batched(password, compiled) == expected
@@ -1,5 +1,46 @@
 import json
+import re
 import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+# Characters read from a JSON file at a time when streaming
+CHUNK_SIZE = 1024 * 1024
+
+# Events produced by the streaming tokenizer
+START_OBJECT, END_OBJECT, START_ARRAY, END_ARRAY, KEY, VALUE = range(6)
+
+TOKEN_PATTERN = re.compile(
+    r"""\s*(?:
+        (?P<punctuation>[{}\[\],:])
+        |"(?P<string>(?:[^"\\]|\\.)*)"
+        |(?P<number>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+        |(?P<literal>true|false|null)
+    )""",
+    re.VERBOSE,
+)
+
+# What a token cut off at the end of a chunk can look like, anything else is already invalid
+PARTIAL_TOKEN_PATTERN = re.compile(
+    r"""\s*(?:
+        "(?:[^"\\]|\\.)*\\?
+        |-?(?:\d+(?:\.\d*)?(?:[eE][+-]?\d*)?)?
+        |t(?:r(?:u)?)?
+        |f(?:a(?:l(?:s)?)?)?
+        |n(?:u(?:l)?)?
+    )""",
+    re.VERBOSE,
+)
+
+
+class FilterSums(NamedTuple):
+    totals: Dict[Any, int]
+    # Time spent excluding forbidden objects for each filter, on top of the shared traversal
+    filter_seconds: Dict[Any, float]
+    seconds: float
+
+
+LITERALS = {"true": True, "false": False, "null": None}
 
 
 def recursive_sum(element, forbidden_value="red") -> int:
@@ -23,17 +64,273 @@ def recursive_sum(element, forbidden_value="red") -> int:
     return total
 
 
+def value_key(value) -> Tuple[bool, Any]:
+    """Return a key telling booleans apart from the numbers they compare equal to, true isn't 1 here."""
+    return isinstance(value, bool), value
+
+
+def read_chunks(filename: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Yield the contents of the file chunk_size characters at a time."""
+    with open(filename) as json_file:
+        while chunk := json_file.read(chunk_size):
+            yield chunk
+
+
+def parse_string(raw: str) -> str:
+    """Return the value of a JSON string's contents, only decoding escapes when there are any."""
+    return json.loads(f'"{raw}"') if "\\" in raw else raw
+
+
+def json_events(chunks: Iterable[str]) -> Iterator[Tuple[int, Any]]:
+    """Yield (event, value) pairs for a JSON document split over any number of chunks.
+
+    Tokens cut off at the end of a chunk are carried over to the next one, so only a single token is
+    ever held besides the current chunk. Raises ValueError as soon as the document is malformed,
+    including when it ends with containers still open.
+    """
+    buffer: str = ""
+    # Characters dropped from the front of the buffer, to report where a document went wrong
+    consumed: int = 0
+    # Whether each open container is an object, to tell keys apart from string values
+    in_object: List[bool] = []
+    # What the grammar allows next, the first key or value of a container may also be its closer
+    expected: str = "value"
+    chunks = iter(chunks)
+    finished: bool = False
+
+    while not finished:
+        chunk = next(chunks, None)
+        if chunk is None:
+            finished = True
+        else:
+            buffer += chunk
+
+        position: int = 0
+        while True:
+            match = TOKEN_PATTERN.match(buffer, position)
+
+            # Only a token cut off by the end of the chunk is carried over to the next one, anything else
+            # that doesn't match can never become valid. A number can only still grow by up to 2 characters
+            if (
+                not finished
+                and (
+                    match is None
+                    or match.group("number") is not None
+                    and len(buffer) - match.end() <= 2
+                )
+                and PARTIAL_TOKEN_PATTERN.fullmatch(buffer, position)
+            ):
+                break
+            if match is None:
+                start: int = len(buffer) - len(buffer[position:].lstrip())
+                if start == len(buffer):
+                    break
+
+                raise ValueError(
+                    f"Invalid JSON at character {consumed + start}: {buffer[start:start + 40]!r}"
+                )
+
+            position = match.end()
+            punctuation = match.group("punctuation")
+            token: str = match.group().strip()
+            token_start: int = consumed + position - len(token)
+            is_key: bool = expected in ("key", "first key")
+
+            if punctuation in ("}", "]"):
+                closes_object: bool = punctuation == "}"
+                if (
+                    not (
+                        expected == "separator"
+                        or expected == ("first key" if closes_object else "first value")
+                    )
+                    or in_object[-1] != closes_object
+                ):
+                    raise ValueError(f"Unexpected {token!r} at character {token_start}")
+
+                in_object.pop()
+                expected = "separator" if in_object else "end"
+                yield END_OBJECT if closes_object else END_ARRAY, None
+            elif punctuation in (",", ":"):
+                if expected != ("separator" if punctuation == "," else "colon"):
+                    raise ValueError(f"Unexpected {token!r} at character {token_start}")
+
+                expected = "key" if punctuation == "," and in_object[-1] else "value"
+            elif not (
+                expected in ("value", "first value")
+                or is_key
+                and match.group("string") is not None
+            ):
+                raise ValueError(f"Unexpected {token!r} at character {token_start}")
+            elif punctuation in ("{", "["):
+                in_object.append(punctuation == "{")
+                expected = "first key" if punctuation == "{" else "first value"
+                yield START_OBJECT if punctuation == "{" else START_ARRAY, None
+            else:
+                if is_key:
+                    expected = "colon"
+                    yield KEY, parse_string(match.group("string"))
+                    continue
+
+                expected = "separator" if in_object else "end"
+                if match.group("string") is not None:
+                    yield VALUE, parse_string(match.group("string"))
+                elif match.group("number") is not None:
+                    yield VALUE, json.loads(match.group("number"))
+                else:
+                    yield VALUE, LITERALS[match.group("literal")]
+
+        buffer = buffer[position:]
+        consumed += position
+
+    if expected != "end":
+        raise ValueError("JSON document ended before it was complete")
+
+
+def stream_sum(
+    filename: str, forbidden_value="red", chunk_size: int = CHUNK_SIZE
+) -> int:
+    """Sum every integer in a JSON file while reading it, skipping objects with forbidden_value as a value.
+
+    Each open container keeps its partial sum on an explicit stack, an object's sum is only added to its
+    parent once it closes without having held forbidden_value, so any nesting depth works.
+    """
+    total: int = 0
+    forbidden_key: Tuple[bool, Any] = value_key(forbidden_value)
+    # [partial sum, whether the container is an object holding forbidden_value]
+    stack: List[List] = []
+
+    for event, value in json_events(read_chunks(filename, chunk_size)):
+        if event == VALUE:
+            # Like recursive_sum floats are skipped, unlike it booleans aren't counted as integers
+            if isinstance(value, int) and not isinstance(value, bool):
+                if stack:
+                    stack[-1][0] += value
+                else:
+                    total += value
+
+            # Integers can be forbidden too, the whole object is skipped then
+            if stack and stack[-1][1] is not None and value_key(value) == forbidden_key:
+                stack[-1][1] = True
+        elif event == START_OBJECT:
+            stack.append([0, False])
+        elif event == START_ARRAY:
+            # Arrays can't be forbidden
+            stack.append([0, None])
+        elif event in (END_OBJECT, END_ARRAY):
+            partial_sum, forbidden = stack.pop()
+            if forbidden:
+                continue
+
+            if stack:
+                stack[-1][0] += partial_sum
+            else:
+                total += partial_sum
+
+    return total
+
+
+def tree_events(data) -> Iterator[Tuple[int, Any]]:
+    """Yield the same events as json_events for already parsed JSON data, walking it with an explicit stack."""
+    # Iterators over the open containers, objects iterate over their items
+    stack: List[Tuple[Iterator, bool]] = []
+    pending: List[Any] = [data]
+
+    while pending or stack:
+        if pending:
+            element = pending.pop()
+            if isinstance(element, dict):
+                yield START_OBJECT, None
+                stack.append((iter(element.items()), True))
+            elif isinstance(element, list):
+                yield START_ARRAY, None
+                stack.append((iter(element), False))
+            else:
+                yield VALUE, element
+            continue
+
+        children, is_object = stack[-1]
+        child = next(children, children)
+        if child is children:
+            stack.pop()
+            yield END_OBJECT if is_object else END_ARRAY, None
+        elif is_object:
+            key, value = child
+            yield KEY, key
+            pending.append(value)
+        else:
+            pending.append(child)
+
+
+def multi_filter_sum(
+    events: Iterable[Tuple[int, Any]], forbidden_values: Iterable
+) -> FilterSums:
+    """Sum every integer once for each forbidden value, skipping objects holding it, in a single traversal.
+
+    Each open container keeps one partial sum per filter on an explicit stack. forbidden_values must be
+    hashable and distinct since they key the results, raises ValueError otherwise.
+    """
+    started: float = time.perf_counter()
+    filters: List = list(forbidden_values)
+    filter_index: Dict[Tuple[bool, Any], int] = {
+        value_key(value): idx for idx, value in enumerate(filters)
+    }
+    if len(filter_index) != len(filters) or len(set(filters)) != len(filters):
+        raise ValueError(f"Forbidden values must be distinct: {filters!r}")
+    filter_seconds: List[float] = [0.0] * len(filters)
+
+    totals: List[int] = [0] * len(filters)
+    # [partial sums, filters forbidding the container or None for arrays]
+    stack: List[List] = []
+
+    for event, value in events:
+        if event == VALUE:
+            if isinstance(value, int) and not isinstance(value, bool):
+                sums: List[int] = stack[-1][0] if stack else totals
+                for idx in range(len(sums)):
+                    sums[idx] += value
+
+            if stack and stack[-1][1] is not None:
+                try:
+                    idx = filter_index.get(value_key(value), -1)
+                except TypeError:
+                    # Unhashable values can't be any filter's forbidden value
+                    idx = -1
+
+                if idx != -1:
+                    stack[-1][1][idx] = True
+        elif event == START_OBJECT:
+            stack.append([[0] * len(filters), [False] * len(filters)])
+        elif event == START_ARRAY:
+            stack.append([[0] * len(filters), None])
+        elif event in (END_OBJECT, END_ARRAY):
+            partial_sums, forbidden = stack.pop()
+            parent_sums: List[int] = stack[-1][0] if stack else totals
+
+            for idx, partial_sum in enumerate(partial_sums):
+                filter_started: float = time.perf_counter()
+                if not forbidden or not forbidden[idx]:
+                    parent_sums[idx] += partial_sum
+                filter_seconds[idx] += time.perf_counter() - filter_started
+
+    return FilterSums(
+        dict(zip(filters, totals)),
+        dict(zip(filters, filter_seconds)),
+        time.perf_counter() - started,
+    )
+
+
 def main():
     filename = sys.argv[1]
-    data = json.load(open(filename))
 
     # Use a guaranteed to be unique sentinel
-    total = recursive_sum(data, forbidden_value=object())
-    print(f"Part 1 total: {total}")
+    unfiltered = object()
+    sums: FilterSums = multi_filter_sum(
+        json_events(read_chunks(filename)), (unfiltered, "red")
+    )
 
-    total = recursive_sum(data)
-    print(f"Part 2 total: {total}")
+    print(f"Part 1 total: {sums.totals[unfiltered]}")
+    print(f"Part 2 total: {sums.totals['red']}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,196 @@
+import json
+
+import pytest
+
+from day12 import (
+    END_ARRAY,
+    END_OBJECT,
+    KEY,
+    START_ARRAY,
+    START_OBJECT,
+    VALUE,
+    json_events,
+    multi_filter_sum,
+    read_chunks,
+    recursive_sum,
+    stream_sum,
+    tree_events,
+)
+
+SAMPLE_DOCUMENT = '{"a": [1, {"b": "red", "c": 2}, -30.5e1], "d\\"e": {"f": 10, "g": [true, null]}, "h": -4}'
+
+
+def split(document: str, chunk_size: int):
+    return [
+        document[idx : idx + chunk_size] for idx in range(0, len(document), chunk_size)
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1000])
+def test_json_events_across_chunk_boundaries(chunk_size):
+    events = list(json_events(split(SAMPLE_DOCUMENT, chunk_size)))
+
+    assert events == list(tree_events(json.loads(SAMPLE_DOCUMENT)))
+
+
+def test_json_events():
+    assert list(json_events(['{"a": [1, "x"], "b": {}}'])) == [
+        (START_OBJECT, None),
+        (KEY, "a"),
+        (START_ARRAY, None),
+        (VALUE, 1),
+        (VALUE, "x"),
+        (END_ARRAY, None),
+        (KEY, "b"),
+        (START_OBJECT, None),
+        (END_OBJECT, None),
+        (END_OBJECT, None),
+    ]
+
+
+@pytest.mark.parametrize("chunks", [["1", "2.5"], ["1", ".5"], ["-", "3e", "2"]])
+def test_json_events_number_split_across_chunks(chunks):
+    assert list(json_events(chunks)) == [(VALUE, json.loads("".join(chunks)))]
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        "",
+        "[1,",
+        '{"a": [1, 2]',
+        "[1 2]",
+        "}",
+        ",",
+        "[1]]",
+        "[}",
+        "{]",
+        "[1,]",
+        '{"a": 1,}',
+        '{"a" 1}',
+        "{1: 2}",
+        '["a": 1]',
+        "1 2",
+        "[nope]",
+    ],
+)
+def test_json_events_rejects_malformed_documents(document):
+    for chunk_size in (1, 1000):
+        with pytest.raises(ValueError):
+            list(json_events(split(document, chunk_size)))
+
+
+@pytest.mark.parametrize(
+    "document, position",
+    [
+        ("[1 2]", 3),
+        ('{"a" 1}', 5),
+        ('["x" "y"]', 5),
+        ("[1, true false]", 9),
+        ("[1,]", 3),
+        ("[1, @]", 4),
+        ('  {"a": 1}}', 10),
+    ],
+)
+def test_json_events_reports_error_position(document, position):
+    for chunk_size in (1, 2, 1000):
+        with pytest.raises(ValueError, match=f"at character {position}\\b"):
+            list(json_events(split(document, chunk_size)))
+
+
+def test_json_events_rejects_bad_token_before_reading_on():
+    chunks_read = 0
+
+    def chunks():
+        nonlocal chunks_read
+        yield "[1, @"
+        while chunks_read < 1000:
+            chunks_read += 1
+            yield "1," * 1000
+
+    with pytest.raises(ValueError, match="at character 4"):
+        list(json_events(chunks()))
+    assert chunks_read == 0
+
+
+@pytest.mark.parametrize(
+    "chunks",
+    [["[1", "0, -", "2]"], ["[tr", "ue, fa", "lse, n", "ull]"], ['["a\\', '"b"]']],
+)
+def test_json_events_tokens_split_across_chunks(chunks):
+    assert list(json_events(chunks)) == list(tree_events(json.loads("".join(chunks))))
+
+
+@pytest.mark.parametrize(
+    "document, forbidden_value, expected",
+    [
+        ("[1,2,3]", "red", 6),
+        ('{"a":2,"b":4}', "red", 6),
+        ("[[[3]]]", "red", 3),
+        ('{"a":{"b":4},"c":-1}', "red", 3),
+        ('[1,{"c":"red","b":2},3]', "red", 4),
+        ('{"d":"red","e":[1,2,3,4],"f":5}', "red", 0),
+        ('[1,"red",5]', "red", 6),
+        (SAMPLE_DOCUMENT, "red", 7),
+        (SAMPLE_DOCUMENT, "blue", 9),
+    ],
+)
+def test_stream_sum(tmp_path, document, forbidden_value, expected):
+    filename = tmp_path / "document.json"
+    filename.write_text(document)
+
+    assert stream_sum(str(filename), forbidden_value, chunk_size=3) == expected
+    # Unlike stream_sum, recursive_sum counts booleans as integers
+    if "true" not in document:
+        assert recursive_sum([json.loads(document)], forbidden_value) == expected
+
+
+def test_stream_sum_rejects_truncated_documents(tmp_path):
+    filename = tmp_path / "document.json"
+    filename.write_text(SAMPLE_DOCUMENT[:-10])
+
+    with pytest.raises(ValueError):
+        stream_sum(str(filename))
+
+
+def test_multi_filter_sum_matches_single_filters(tmp_path):
+    filename = tmp_path / "document.json"
+    filename.write_text(SAMPLE_DOCUMENT)
+    filters = ("red", "blue", 10, 2.0)
+
+    sums = multi_filter_sum(json_events(read_chunks(str(filename), 5)), filters)
+
+    assert sums.totals == {
+        forbidden_value: stream_sum(str(filename), forbidden_value)
+        for forbidden_value in filters
+    }
+    assert (
+        sums.totals
+        == multi_filter_sum(tree_events(json.loads(SAMPLE_DOCUMENT)), filters).totals
+    )
+    assert set(sums.filter_seconds) == set(filters)
+
+
+@pytest.mark.parametrize(
+    "data, forbidden_value, expected",
+    [
+        ([{"a": 5, "b": 7}, {"c": 1}], 5, 1),
+        ([5, {"c": 1}], 5, 6),
+        ([{"a": 1, "b": 7}, {"c": True, "d": 2}], 1, 2),
+        ([{"a": 1, "b": 7}, {"c": True, "d": 2}], True, 8),
+    ],
+)
+def test_multi_filter_sum_number_filters(tmp_path, data, forbidden_value, expected):
+    filename = tmp_path / "document.json"
+    filename.write_text(json.dumps(data))
+
+    sums = multi_filter_sum(tree_events(data), (forbidden_value, "red"))
+
+    assert sums.totals[forbidden_value] == expected
+    assert stream_sum(str(filename), forbidden_value) == expected
+
+
+@pytest.mark.parametrize("filters", [("red", "red"), (1, True), (2, 2.0)])
+def test_multi_filter_sum_rejects_colliding_filters(filters):
+    with pytest.raises(ValueError):
+        multi_filter_sum(tree_events([1]), filters)
@@ -0,0 +1,143 @@
+import random
+
+import pytest
+
+from day13 import (
+    SeatingProblem,
+    build_happiness_matrix,
+    build_rules_lookup,
+    evaluate_rules,
+    seat_bitmask,
+    seat_branch_and_bound,
+    seat_exhaustive,
+)
+
+SAMPLE_RULES = """Alice would gain 54 happiness units by sitting next to Bob.
+Alice would lose 79 happiness units by sitting next to Carol.
+Alice would lose 2 happiness units by sitting next to David.
+Bob would gain 83 happiness units by sitting next to Alice.
+Bob would lose 7 happiness units by sitting next to Carol.
+Bob would lose 63 happiness units by sitting next to David.
+Carol would lose 62 happiness units by sitting next to Alice.
+Carol would gain 60 happiness units by sitting next to Bob.
+Carol would gain 55 happiness units by sitting next to David.
+David would gain 46 happiness units by sitting next to Alice.
+David would lose 7 happiness units by sitting next to Bob.
+David would gain 41 happiness units by sitting next to Carol.
+""".splitlines()
+
+
+def random_scores(rng: random.Random, guests) -> dict:
+    return {guest: rng.randint(-100, 100) for guest in guests if rng.random() < 0.8}
+
+
+def arrangement_score(problem: SeatingProblem, arrangement) -> int:
+    seats = [problem.guests.index(guest) for guest in arrangement]
+
+    return sum(
+        problem.pairs[seat, seats[(idx + 1) % len(seats)]]
+        for idx, seat in enumerate(seats)
+    )
+
+
+def assert_matches_fresh_solve(problem: SeatingProblem) -> None:
+    seating = problem.best()
+    score, _ = seat_exhaustive(problem.pairs)
+
+    assert seating.score == score
+    assert sorted(seating.arrangement) == sorted(problem.guests)
+    if len(problem.guests) > 2:
+        assert arrangement_score(problem, seating.arrangement) == score
+
+
+@pytest.mark.parametrize("branch_and_bound", [False, True])
+def test_evaluate_rules(branch_and_bound):
+    assert evaluate_rules(SAMPLE_RULES, branch_and_bound) == 330
+
+
+@pytest.mark.parametrize("guests", range(2, 9))
+def test_solvers_agree(guests):
+    rng = random.Random(guests)
+    problem = SeatingProblem({})
+    for guest in range(guests):
+        problem.add_guest(f"G{guest}", random_scores(rng, problem.guests))
+
+    expected, _ = seat_exhaustive(problem.pairs)
+    assert seat_bitmask(problem.pairs)[0] == expected
+    assert seat_branch_and_bound(problem.pairs)[0] == expected
+
+
+def test_add_me_with_zero_happiness():
+    problem = SeatingProblem.from_rules(SAMPLE_RULES)
+    assert problem.best().score == 330
+
+    problem.add_guest("Me")
+    assert_matches_fresh_solve(problem)
+
+    problem.remove_guest("Me")
+    assert problem.best().score == 330
+
+
+def test_remove_first_guest():
+    problem = SeatingProblem.from_rules(SAMPLE_RULES)
+    problem.best()
+
+    problem.remove_guest("Alice")
+    assert problem.table is None
+    assert_matches_fresh_solve(problem)
+
+
+def test_remove_guest_never_tabled():
+    problem = SeatingProblem.from_rules(SAMPLE_RULES)
+    problem.best()
+
+    problem.add_guest("Eve", {"Bob": 30, "David": -20})
+    problem.add_guest("Frank", {"Alice": 15})
+    problem.remove_guest("Eve")
+    assert_matches_fresh_solve(problem)
+
+    expected = SeatingProblem.from_rules(SAMPLE_RULES)
+    expected.add_guest("Frank", {"Alice": 15})
+    assert problem.best().score == expected.best().score
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_incremental_changes_match_fresh_solve(seed):
+    rng = random.Random(seed)
+    problem = SeatingProblem(build_rules_lookup(SAMPLE_RULES))
+    added = 0
+
+    for _ in range(12):
+        if problem.guests and (rng.random() < 0.4 or len(problem.guests) > 7):
+            problem.remove_guest(rng.choice(problem.guests))
+        else:
+            problem.add_guest(f"Guest{added}", random_scores(rng, problem.guests))
+            added += 1
+
+        if problem.guests and rng.random() < 0.7:
+            assert_matches_fresh_solve(problem)
+
+
+def test_memory_budget_falls_back_to_branch_and_bound():
+    problem = SeatingProblem(build_rules_lookup(SAMPLE_RULES), memory_budget=0)
+
+    assert problem.best().score == 330
+    assert problem.table is None
+
+
+def test_add_guest_rejects_unknown_and_duplicate_guests():
+    problem = SeatingProblem.from_rules(SAMPLE_RULES)
+
+    with pytest.raises(ValueError):
+        problem.add_guest("Alice")
+    with pytest.raises(ValueError):
+        problem.add_guest("Eve", {"Mallory": 10})
+    with pytest.raises(ValueError):
+        problem.remove_guest("Mallory")
+
+
+def test_happiness_matrix_is_symmetric():
+    matrix = build_happiness_matrix(build_rules_lookup(SAMPLE_RULES))
+
+    assert (matrix.pairs == matrix.pairs.T).all()
+    assert matrix.pairs[0, 1] == 54 + 83
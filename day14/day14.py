@@ -1,6 +1,12 @@
+import heapq
 import re
 import sys
-from typing import Callable, Dict, List, NamedTuple, Sequence
+from typing import Callable, Dict, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+# Reindeer seconds simulated at once by herd_points, bounds the size of the distance blocks
+BLOCK_CELLS = 1 << 22
 
 
 # Model our reindeer in an immutable fashion to simplify tracking
@@ -28,8 +34,8 @@ def parse_reindeer(raw_reindeer) -> Reindeer:
 
 
 def find_winner(racers: List[Reindeer], key_func: Callable) -> Reindeer:
-    """Return the winning reineer determined by the provided key function."""
-    return sorted(racers, key=key_func, reverse=True)[0]
+    """Return the winning reineer determined by the provided key function, the first one listed on ties."""
+    return max(racers, key=key_func)
 
 
 def award_points(racers: List[Reindeer], point_delta=1) -> List[Reindeer]:
@@ -57,50 +63,103 @@ def award_points(racers: List[Reindeer], point_delta=1) -> List[Reindeer]:
     return new_racers
 
 
+def reindeer_at(reindeer: Reindeer, seconds: int, points: int = 0) -> Reindeer:
+    """Return the reindeer as it is after flying for seconds, in O(1) since flying and resting repeat."""
+    cycles, into_cycle = divmod(seconds, reindeer.uptime + reindeer.downtime)
+    resting: bool = into_cycle >= reindeer.uptime
+
+    # Every full cycle flies for the whole uptime, the last one for at most that
+    flying_seconds: int = cycles * reindeer.uptime + min(into_cycle, reindeer.uptime)
+
+    return reindeer._replace(
+        resting=resting,
+        seconds_in_state=into_cycle - reindeer.uptime if resting else into_cycle,
+        distance_traveled=flying_seconds * reindeer.speed,
+        points=points,
+    )
+
+
+def award_span(
+    distances: List[int], speeds: List[int], points: List[int], seconds: int
+) -> None:
+    """Award the points for the next seconds while every reindeer keeps flying or resting, in place.
+
+    Each reindeer travels in a straight line over the span, so after finding the leaders once the same
+    leaders keep the lead until the nearest faster reindeer catches up with them.
+    """
+    second: int = 1
+    while second <= seconds:
+        positions: List[int] = [
+            distance + speed * second for distance, speed in zip(distances, speeds)
+        ]
+        leader_distance: int = max(positions)
+        leaders: List[int] = [
+            idx for idx, position in enumerate(positions) if position == leader_distance
+        ]
+        for idx in leaders:
+            points[idx] += 1
+
+        # Tied leaders going slower than the others drop behind right away
+        leader_speed: int = max(speeds[idx] for idx in leaders)
+        front: List[int] = [idx for idx in leaders if speeds[idx] == leader_speed]
+
+        next_second: int = seconds + 1
+        for position, speed in zip(positions, speeds):
+            if speed > leader_speed:
+                # First second this reindeer is level with or ahead of the front
+                caught_up: int = second - (
+                    (position - leader_distance) // (speed - leader_speed)
+                )
+                next_second = min(next_second, caught_up)
+
+        for idx in front:
+            points[idx] += next_second - second - 1
+
+        second = next_second
+
+
+def herd_points(
+    all_reindeer: Sequence[Reindeer], race_time=2503, block_cells=BLOCK_CELLS
+) -> np.ndarray:
+    """Return the points each reindeer scores leading the race, simulating the whole herd in blocks of seconds.
+
+    Each block holds every reindeer's distance after each of its seconds as a (racers x seconds) array,
+    from whether they fly that second and a cumulative sum carried over from the previous block.
+    """
+    speeds = np.array([reindeer.speed for reindeer in all_reindeer], dtype=np.int64)
+    uptimes = np.array([reindeer.uptime for reindeer in all_reindeer], dtype=np.int64)
+    cycles = uptimes + [reindeer.downtime for reindeer in all_reindeer]
+
+    block_size: int = max(1, block_cells // max(1, len(all_reindeer)))
+    distances = np.zeros(len(all_reindeer), dtype=np.int64)
+    points = np.zeros(len(all_reindeer), dtype=np.int64)
+
+    for start in range(0, race_time, block_size):
+        seconds: np.ndarray = np.arange(start, min(start + block_size, race_time))
+        flying: np.ndarray = seconds % cycles[:, None] < uptimes[:, None]
+
+        traveled: np.ndarray = distances[:, None] + np.cumsum(
+            flying * speeds[:, None], axis=1
+        )
+        points += (traveled == traveled.max(axis=0)).sum(axis=1)
+        distances = traveled[:, -1]
+
+    return points
+
+
 def race_reindeer(
     all_reindeer: Sequence[Reindeer], race_time=2503, part_two=False
 ) -> Reindeer:
     """Run the race for race_time seconds and return the winner."""
+    points = (
+        herd_points(all_reindeer, race_time) if part_two else [0] * len(all_reindeer)
+    )
 
-    # Don't modify our original reindeer,
-    # reindeer are immutable so a shallow copy is safe
-    racers = list(all_reindeer)
-
-    for _ in range(race_time):
-        # Create a new, updated reindeer each tick and update racers
-        for idx, reindeer in enumerate(racers):
-            distance_delta: int = 0
-            seconds_in_state: int = 0
-            new_state = reindeer.resting
-
-            if not reindeer.resting:
-                distance_delta += reindeer.speed
-
-            if reindeer.resting and reindeer.seconds_in_state == reindeer.downtime - 1:
-                new_state = not reindeer.resting
-            elif (
-                not reindeer.resting
-                and reindeer.seconds_in_state == reindeer.uptime - 1
-            ):
-                new_state = not reindeer.resting
-            else:
-                seconds_in_state = reindeer.seconds_in_state + 1
-
-            updated_reindeer = Reindeer(
-                reindeer.name,
-                reindeer.speed,
-                reindeer.uptime,
-                reindeer.downtime,
-                new_state,
-                seconds_in_state,
-                reindeer.distance_traveled + distance_delta,
-                reindeer.points,
-            )
-
-            racers[idx] = updated_reindeer
-
-        if part_two:
-            racers = award_points(racers)
+    # Reindeer are immutable so every racer is rebuilt from the original with its final state
+    racers: List[Reindeer] = [
+        reindeer_at(reindeer, race_time, int(reindeer_points))
+        for reindeer, reindeer_points in zip(all_reindeer, points)
+    ]
 
     if part_two:
         key = lambda reindeer: reindeer.points
@@ -110,17 +169,98 @@ def race_reindeer(
     return find_winner(racers, key)
 
 
+def race_reindeer_events(
+    all_reindeer: Sequence[Reindeer], race_time=2503, part_two=False
+) -> Reindeer:
+    """Run the race for race_time seconds and return the winner, jumping between changes of state.
+
+    Distances come straight from reindeer_at for part 1. For part 2 only the reindeer that could be
+    leading are followed, from one second where one of them starts or stops flying to the next.
+    A reindeer far enough behind is set aside until flying nonstop could first bring it level with the
+    current lead, since the lead never shrinks.
+    """
+    if not part_two:
+        racers = [reindeer_at(reindeer, race_time) for reindeer in all_reindeer]
+        return find_winner(racers, lambda reindeer: reindeer.distance_traveled)
+
+    points: List[int] = [0] * len(all_reindeer)
+    contenders: List[int] = list(range(len(all_reindeer)))
+    # (second to follow the reindeer again, reindeer index)
+    set_aside: List[Tuple[int, int]] = []
+
+    elapsed: int = 0
+    while elapsed < race_time:
+        while set_aside and set_aside[0][0] <= elapsed:
+            contenders.append(heapq.heappop(set_aside)[1])
+
+        racers: List[Reindeer] = [
+            reindeer_at(all_reindeer[idx], elapsed) for idx in contenders
+        ]
+        next_change: int = min(
+            elapsed
+            + (
+                reindeer.downtime - reindeer.seconds_in_state
+                if reindeer.resting
+                else reindeer.uptime - reindeer.seconds_in_state
+            )
+            for reindeer in racers
+        )
+        if set_aside:
+            next_change = min(next_change, set_aside[0][0])
+        next_change = min(next_change, race_time)
+
+        span_points: List[int] = [0] * len(racers)
+        award_span(
+            [reindeer.distance_traveled for reindeer in racers],
+            [0 if reindeer.resting else reindeer.speed for reindeer in racers],
+            span_points,
+            next_change - elapsed,
+        )
+        for idx, reindeer_points in zip(contenders, span_points):
+            points[idx] += reindeer_points
+        elapsed = next_change
+
+        distances: List[int] = [
+            reindeer_at(all_reindeer[idx], elapsed).distance_traveled
+            for idx in contenders
+        ]
+        leader_distance: int = max(distances)
+        following: List[int] = []
+        for idx, distance in zip(contenders, distances):
+            reindeer = all_reindeer[idx]
+            if not reindeer.speed:
+                # A reindeer that never moves can't catch up once it's behind
+                if distance == leader_distance:
+                    following.append(idx)
+                continue
+
+            # The second before the reindeer could first be level with the lead
+            level: int = elapsed - (distance - leader_distance) // reindeer.speed - 1
+            if level > elapsed + reindeer.uptime + reindeer.downtime:
+                heapq.heappush(set_aside, (level, idx))
+            else:
+                following.append(idx)
+        contenders = following
+
+    racers = [
+        reindeer_at(reindeer, race_time, reindeer_points)
+        for reindeer, reindeer_points in zip(all_reindeer, points)
+    ]
+
+    return find_winner(racers, lambda reindeer: reindeer.points)
+
+
 def main():
     filename: str = sys.argv[1]
     reindeer_performance: List[str] = open(filename).readlines()
 
     all_reindeer = tuple(parse_reindeer(reindeer) for reindeer in reindeer_performance)
-    winner = race_reindeer(all_reindeer)
+    winner = race_reindeer_events(all_reindeer)
     print(
         f"Part 1: {winner.name} won after traveling {winner.distance_traveled} kilometers."
     )
 
-    winner = race_reindeer(all_reindeer, part_two=True)
+    winner = race_reindeer_events(all_reindeer, part_two=True)
     print(f"Part 2: {winner.name} won with {winner.points} points.")
 
 
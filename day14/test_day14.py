@@ -0,0 +1,103 @@
+import random
+from typing import List, Sequence, Tuple
+
+import pytest
+
+from day14 import (
+    Reindeer,
+    herd_points,
+    parse_reindeer,
+    race_reindeer,
+    race_reindeer_events,
+    reindeer_at,
+)
+
+COMET = Reindeer("Comet", 14, 10, 127)
+DANCER = Reindeer("Dancer", 16, 11, 162)
+
+
+def tick_race(
+    all_reindeer: Sequence[Reindeer], race_time: int
+) -> Tuple[List[int], List[int]]:
+    """Return every reindeer's distance and points, simulated one second at a time."""
+    distances = [0] * len(all_reindeer)
+    points = [0] * len(all_reindeer)
+
+    for second in range(race_time):
+        for idx, reindeer in enumerate(all_reindeer):
+            if second % (reindeer.uptime + reindeer.downtime) < reindeer.uptime:
+                distances[idx] += reindeer.speed
+
+        leader_distance = max(distances)
+        for idx, distance in enumerate(distances):
+            if distance == leader_distance:
+                points[idx] += 1
+
+    return distances, points
+
+
+def random_herd(rng: random.Random, size: int, max_speed: int = 30) -> List[Reindeer]:
+    return [
+        Reindeer(
+            f"R{idx}", rng.randint(0, max_speed), rng.randint(1, 15), rng.randint(1, 60)
+        )
+        for idx in range(size)
+    ]
+
+
+def test_parse_reindeer():
+    raw = "Comet can fly 14 km/s for 10 seconds, but then must rest for 127 seconds."
+
+    assert parse_reindeer(raw) == COMET
+
+
+@pytest.mark.parametrize("race", [race_reindeer, race_reindeer_events])
+def test_example_race(race):
+    winner = race([COMET, DANCER], race_time=1000)
+    assert (winner.name, winner.distance_traveled) == ("Comet", 1120)
+
+    winner = race([COMET, DANCER], race_time=1000, part_two=True)
+    assert (winner.name, winner.points) == ("Dancer", 689)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_herd_points_match_ticks(seed):
+    rng = random.Random(seed)
+    herd = random_herd(rng, rng.randint(1, 12))
+    race_time = rng.randint(0, 600)
+
+    distances, points = tick_race(herd, race_time)
+
+    assert (
+        herd_points(herd, race_time, block_cells=rng.randint(1, 500)).tolist() == points
+    )
+    assert [
+        reindeer_at(reindeer, race_time).distance_traveled for reindeer in herd
+    ] == distances
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("part_two", [False, True])
+def test_event_race_matches_ticks(seed, part_two):
+    rng = random.Random(seed)
+    # Similar speeds keep several reindeer in contention, fast ones set the others aside
+    herd = random_herd(rng, rng.randint(1, 25), max_speed=rng.choice([3, 30]))
+    race_time = rng.randint(0, 3000)
+
+    distances, points = tick_race(herd, race_time)
+    key = points if part_two else distances
+    winner = race_reindeer_events(herd, race_time, part_two)
+
+    # Ties go to the first reindeer listed
+    assert winner.name == herd[key.index(max(key))].name
+    assert winner.points == (max(points) if part_two else 0)
+    assert winner.distance_traveled == distances[key.index(max(key))]
+    assert winner == race_reindeer(herd, race_time, part_two)
+
+
+def test_event_race_with_reindeer_that_never_fly():
+    herd = [Reindeer("Stuck", 0, 5, 5), COMET, Reindeer("Parked", 0, 1, 1)]
+    _, points = tick_race(herd, 500)
+
+    winner = race_reindeer_events(herd, 500, part_two=True)
+    assert (winner.name, winner.points) == ("Comet", max(points))